@@ -0,0 +1,144 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from app.config import (
+    PWD_CONTEXT_SCHEMES,
+    PWD_CONTEXT_DEPRECATED,
+    BCRYPT_ROUNDS,
+    HASH_WORKERS,
+    HASH_MAX_PENDING,
+    HASH_TIMEOUT
+)
+from app.metrics import get_metrics
+
+# 密码上下文（工作进程导入本模块时各自创建）
+pwd_context = CryptContext(
+    schemes=PWD_CONTEXT_SCHEMES,
+    deprecated=PWD_CONTEXT_DEPRECATED,
+    bcrypt__rounds=BCRYPT_ROUNDS
+)
+
+
+class HashingBusyError(Exception):
+    """密码哈希排队请求已达上限，或等待结果超时"""
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+class PasswordHasher:
+    """在进程池中执行 bcrypt 计算，不占用 Streamlit 脚本线程
+
+    进程数默认与 CPU 核数相同；排队和执行中的请求超过 max_pending 时
+    直接拒绝（HashingBusyError），避免登录高峰时请求无限堆积。
+    """
+
+    def __init__(self, workers: int = HASH_WORKERS, max_pending: int = HASH_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._stats_lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor) -> None:
+        with self._executor_lock:
+            if self._executor is broken:
+                self._executor = None
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self._rejected += 1
+            raise HashingBusyError("密码校验请求过多，请稍后重试")
+
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._pending += 1
+
+        def _release(_: Future) -> None:
+            with self._stats_lock:
+                self._pending -= 1
+                self._completed += 1
+                self._total_seconds += time.perf_counter() - started
+            self._slots.release()
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # 工作进程异常退出，重建进程池后重试一次
+            self._reset_executor(executor)
+            try:
+                executor = self._get_executor()
+                future = executor.submit(fn, *args)
+            except Exception:
+                _release(None)
+                raise
+        except Exception:
+            _release(None)
+            raise
+
+        future.add_done_callback(_release)
+        try:
+            return future.result(timeout=HASH_TIMEOUT)
+        except FutureTimeoutError:
+            # 与排队已满一样提示用户稍后重试（任务仍在工作进程中完成并释放名额）
+            raise HashingBusyError("密码校验超时，请稍后重试")
+        except BrokenProcessPool:
+            # 执行中工作进程异常退出：立即重建进程池，本次请求提示稍后重试
+            self._reset_executor(executor)
+            raise HashingBusyError("密码校验服务重启中，请稍后重试")
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """校验密码"""
+        return self._run(_verify, plain_password, hashed_password)
+
+    def hash(self, password: str) -> str:
+        """计算密码哈希"""
+        return self._run(_hash, password)
+
+    def stats(self) -> dict:
+        """队列深度和处理统计"""
+        with self._stats_lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "queue_depth": self._pending,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_ms": self._total_seconds / self._completed * 1000 if self._completed else 0.0
+            }
+
+
+# 创建密码哈希服务（进程池在首次使用时启动）
+password_hasher = PasswordHasher()
+get_metrics().register_collector("password_hasher", password_hasher.stats)
+
+def get_password_hasher() -> PasswordHasher:
+    """获取密码哈希服务"""
+    return password_hasher
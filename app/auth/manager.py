@@ -1,25 +1,23 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from passlib.context import CryptContext
 from jose import JWTError, jwt
+from app.auth.hashing import get_password_hasher
+from app.metrics import timed
 from app.config import (
     JWT_SECRET_KEY,
     JWT_ALGORITHM,
-    JWT_ACCESS_TOKEN_EXPIRE,
-    PWD_CONTEXT_SCHEMES,
-    PWD_CONTEXT_DEPRECATED
+    JWT_ACCESS_TOKEN_EXPIRE
 )
 
-# 密码上下文
-pwd_context = CryptContext(schemes=PWD_CONTEXT_SCHEMES, deprecated=PWD_CONTEXT_DEPRECATED)
-
+@timed("auth")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """验证密码"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """验证密码（在哈希进程池中执行）"""
+    return get_password_hasher().verify(plain_password, hashed_password)
 
+@timed("auth")
 def get_password_hash(password: str) -> str:
-    """获取密码哈希"""
-    return pwd_context.hash(password)
+    """获取密码哈希（在哈希进程池中执行）"""
+    return get_password_hasher().hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """创建访问令牌"""
@@ -32,6 +30,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
     return encoded_jwt
 
+@timed("auth")
 def decode_access_token(token: str) -> Optional[dict]:
     """解码访问令牌"""
     try:
@@ -1,9 +1,38 @@
+import time
 import streamlit as st
 from functools import wraps
+from typing import Optional
+from app.auth.manager import decode_access_token
+from app.auth.session_cache import get_cached_user, cache_user
 from app.redis.client import get_redis
-from app.database.session import SessionLocal
+from app.database.session import get_session
+from app.metrics import timed, timer
 from app.services.user import get_user_by_username
 
+@timed("auth")
+def load_session_user(token: str) -> Optional[dict]:
+    """从 Redis 和数据库验证 token，返回用户信息"""
+    redis_client = get_redis()
+    with timer("redis", "token_get"):
+        username = redis_client.get(f"token:{token}")
+    if not username:
+        return None
+
+    # 验证用户是否仍然有效
+    db = get_session()
+    try:
+        user = get_user_by_username(db, username.decode())
+        if user and user.is_active:
+            return {
+                "id": user.id,
+                "username": user.username,
+                "is_admin": user.is_admin
+            }
+    finally:
+        db.close()
+    return None
+
+@timed("auth")
 def restore_session():
     """从 Redis 恢复会话状态"""
     # 如果已经有会话状态，直接返回
@@ -15,26 +44,23 @@ def restore_session():
     if not token:
         return False
 
-    # 验证 token 是否有效
-    redis_client = get_redis()
-    username = redis_client.get(f"token:{token}")
-    
-    if username:
-        # 验证用户是否仍然有效
-        db = SessionLocal()
-        try:
-            user = get_user_by_username(db, username.decode())
-            if user and user.is_active:
-                # 恢复会话状态
-                st.session_state.user = {
-                    "id": user.id,
-                    "username": user.username,
-                    "is_admin": user.is_admin
-                }
-                st.session_state.token = token
-                return True
-        finally:
-            db.close()
+    # 无状态校验 JWT 签名和有效期，伪造或过期的 token 不再访问 Redis 和数据库
+    payload = decode_access_token(token)
+    if payload:
+        # 优先使用进程内缓存的验证结果
+        user = get_cached_user(token)
+        if user is None:
+            user = load_session_user(token)
+            if user and user["username"] == payload.get("sub"):
+                cache_user(token, user, ttl=payload["exp"] - time.time())
+            else:
+                user = None
+
+        if user:
+            # 恢复会话状态
+            st.session_state.user = dict(user)
+            st.session_state.token = token
+            return True
     
     # 清除无效的 token
     st.query_params.clear()
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.config import SESSION_CACHE_SIZE, SESSION_CACHE_TTL
+from app.metrics import get_metrics
+
+
+class TTLCache:
+    """带过期时间的有界 LRU 缓存（线程安全）"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate) -> int:
+        """删除所有满足 predicate(value) 的条目"""
+        with self._lock:
+            keys = [key for key, (value, _) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+# 已验证的 token -> 用户信息
+_session_cache = TTLCache(SESSION_CACHE_SIZE, SESSION_CACHE_TTL)
+
+
+def get_cached_user(token: str) -> Optional[dict]:
+    """获取缓存的 token 对应用户"""
+    user = _session_cache.get(token)
+    get_metrics().inc("cache_requests_total", cache="session", result="hit" if user is not None else "miss")
+    return user
+
+
+def cache_user(token: str, user: dict, ttl: Optional[float] = None) -> None:
+    """缓存已验证的 token 对应用户（ttl 不超过 SESSION_CACHE_TTL）"""
+    _session_cache.set(token, user, ttl)
+
+
+def invalidate_token(token: str) -> None:
+    """退出登录时使 token 失效"""
+    _session_cache.delete(token)
+
+
+def invalidate_user(username: str) -> int:
+    """用户状态变化（审批、拒绝等）时使该用户的所有 token 失效"""
+    return _session_cache.delete_where(lambda user: user["username"] == username)
+
+
+def invalidate_users(usernames) -> int:
+    """批量使多个用户的 token 失效（只遍历一次缓存）"""
+    usernames = set(usernames)
+    if not usernames:
+        return 0
+    return _session_cache.delete_where(lambda user: user["username"] in usernames)
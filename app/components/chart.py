@@ -0,0 +1,79 @@
+from typing import Dict, List
+
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from app.config import CHART_MAX_POINTS
+from app.market.downsample import downsample_bars
+from app.metrics import timer
+
+# K线图需要的列
+CHART_COLUMNS = ['trade_date', 'open', 'high', 'low', 'close', 'vol']
+
+# A 股习惯：红涨绿跌
+UP_COLOR = "#e4393c"
+DOWN_COLOR = "#1a9850"
+
+
+def candlestick_chart(df: pd.DataFrame, ma_columns: List[str], column_names: Dict[str, str]) -> alt.VConcatChart:
+    """K线 + 均线 + 成交量图（df 为单只股票、已降采样的数据）"""
+    df = df.assign(direction=(df['close'] >= df['open']).map({True: "up", False: "down"}))
+    df = df.rename(columns={column: column_names.get(column, column) for column in ma_columns})
+    color = alt.Color(
+        'direction:N',
+        scale=alt.Scale(domain=["up", "down"], range=[UP_COLOR, DOWN_COLOR]),
+        legend=None
+    )
+    zoom = alt.selection_interval(bind="scales", encodings=["x"])
+    x = alt.X('trade_date:T', title=None)
+    tooltip = [alt.Tooltip('trade_date:T', title=column_names.get('trade_date', '日期'), format="%Y-%m-%d")] + [
+        alt.Tooltip(f'{column}:Q', title=column_names.get(column, column), format=".2f")
+        for column in ['open', 'high', 'low', 'close']
+    ]
+
+    base = alt.Chart(df).encode(x=x)
+    wick = base.mark_rule().encode(
+        y=alt.Y('low:Q', title=column_names.get('close', '价格'), scale=alt.Scale(zero=False)),
+        y2='high:Q',
+        color=color
+    )
+    body = base.mark_bar().encode(y='open:Q', y2='close:Q', color=color, tooltip=tooltip)
+    layers = [wick, body]
+
+    if ma_columns:
+        # 均线使用显示名称作为图例
+        ma_names = [column_names.get(column, column) for column in ma_columns]
+        lines = base.transform_fold(ma_names, as_=['ma', 'value']).mark_line(strokeWidth=1).encode(
+            y='value:Q',
+            color=alt.Color('ma:N', title=None, scale=alt.Scale(domain=ma_names), legend=alt.Legend(orient="top"))
+        )
+        layers.append(lines)
+    price = alt.layer(*layers).resolve_scale(color="independent").add_params(zoom).properties(height=360)
+
+    volume = base.mark_bar().encode(
+        y=alt.Y('vol:Q', title=column_names.get('vol', '成交量')),
+        color=color,
+        tooltip=[alt.Tooltip('vol:Q', title=column_names.get('vol', '成交量'), format=",")]
+    ).properties(height=120)
+
+    return alt.vconcat(price, volume).resolve_scale(x="shared")
+
+
+def price_chart(df: pd.DataFrame, ma_columns: List[str], column_names: Dict[str, str]) -> None:
+    """显示单只股票的价格走势图
+
+    点数超过 CHART_MAX_POINTS 时在服务端重采样为周线/月线，浏览器只接收降采样后的数据。
+    """
+    missing = [column for column in CHART_COLUMNS if column not in df.columns]
+    if missing:
+        st.info("缺少绘图所需的数据列：" + "、".join(column_names.get(column, column) for column in missing))
+        return
+
+    ma_columns = [column for column in ma_columns if column in df.columns]
+    with timer("transform", "downsample_bars"):
+        period, bars = downsample_bars(df[CHART_COLUMNS + ma_columns], CHART_MAX_POINTS, ma_columns)
+    if len(bars) < len(df):
+        st.caption(f"共 {len(df)} 个交易日，已按{period}显示 {len(bars)} 个数据点")
+    with timer("render", "chart"):
+        st.altair_chart(candlestick_chart(bars, ma_columns, column_names), use_container_width=True)
@@ -0,0 +1,51 @@
+import tempfile
+from dataclasses import replace
+from typing import List
+
+import streamlit as st
+
+from app.market.tushare_client import TushareClient
+from app.services.export import EXPORT_FORMATS, EXPORT_MIME_TYPES, EXPORT_SUFFIXES, export_stock_data
+from app.services.market_data import COLUMN_NAMES, StockQuery
+
+
+def build_export(query: StockQuery, client: TushareClient, fmt: str) -> bytes:
+    """逐只股票写入临时文件，返回压缩后的文件内容（不在内存中合并数据）"""
+    with tempfile.TemporaryFile() as sink:
+        export_stock_data(query, client, sink, fmt)
+        sink.seek(0)
+        return sink.read()
+
+
+def export_panel(query: StockQuery, client: TushareClient, columns: List[str], key: str) -> None:
+    """按查询条件导出数据，columns 为默认导出的列
+
+    点击“准备导出”时才生成文件，数据按查询条件重新逐只读取，不使用会话中保存的结果表；
+    生成的文件只在本次运行中提供下载，不保存在会话中。
+    """
+    with st.expander("导出数据"):
+        export_columns = st.multiselect(
+            "导出的列",
+            options=list(COLUMN_NAMES),
+            default=columns,
+            format_func=COLUMN_NAMES.get,
+            key=f"{key}_columns"
+        )
+        fmt = st.radio(
+            "格式",
+            list(EXPORT_FORMATS),
+            format_func=EXPORT_FORMATS.get,
+            horizontal=True,
+            key=f"{key}_format"
+        )
+        if st.button("准备导出", disabled=not export_columns, key=f"{key}_prepare"):
+            with st.spinner("正在生成导出文件..."):
+                data = build_export(replace(query, columns=tuple(export_columns)), client, fmt)
+            st.download_button(
+                "下载",
+                data=data,
+                file_name=f"stocks_{query.start_date:%Y%m%d}_{query.end_date:%Y%m%d}{EXPORT_SUFFIXES[fmt]}",
+                mime=EXPORT_MIME_TYPES[fmt],
+                key=f"{key}_download"
+            )
+        st.caption("全市场导出请使用 scripts/export_data.py，直接写入本地文件")
@@ -0,0 +1,131 @@
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from app.metrics import timed, timer
+
+# 每页可选的行数（每次重跑发送到浏览器的行数不超过最大值）
+PAGE_SIZES = [50, 100, 200, 500]
+
+
+@timed("transform")
+def filter_frame(
+    df: pd.DataFrame,
+    categories: Optional[Dict[str, List[str]]] = None,
+    date_range: Optional[tuple] = None,
+    date_column: str = 'trade_date'
+) -> pd.DataFrame:
+    """按分类取值和日期区间筛选（在服务端执行）"""
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in (categories or {}).items():
+        if values:
+            mask &= df[column].isin(values).to_numpy()
+    if date_range and len(date_range) == 2:
+        dates = df[date_column]
+        mask &= ((dates >= pd.Timestamp(date_range[0])) & (dates <= pd.Timestamp(date_range[1]))).to_numpy()
+    return df if mask.all() else df[mask]
+
+
+@timed("transform")
+def page_frame(df: pd.DataFrame, sort_by: str, ascending: bool, page: int, page_size: int) -> pd.DataFrame:
+    """排序后取出一页数据
+
+    只对排序列求排列顺序，再按位置取出当前页的行，不复制整个结果表。
+    """
+    order = df[sort_by].reset_index(drop=True).sort_values(ascending=ascending, kind='stable', na_position='last')
+    positions = order.index[(page - 1) * page_size:page * page_size]
+    return df.iloc[positions]
+
+
+@timed("transform")
+def to_display_frame(df: pd.DataFrame, columns: List[str], column_names: Dict[str, str]) -> pd.DataFrame:
+    """按所选列生成显示用的表格（显示名称作为列名）
+
+    先投影到所选列再一次性替换列名，只产生一个新表。
+    """
+    columns = [column for column in columns if column in df.columns]
+    display = df[columns]
+    display.columns = [column_names.get(column, column) for column in columns]
+    return display
+
+
+def paged_table(
+    df: pd.DataFrame,
+    columns: List[str],
+    key: str,
+    column_names: Dict[str, str],
+    default_sort: str = 'trade_date'
+) -> None:
+    """服务端分页表格
+
+    完整结果只保存在服务端，排序、筛选和统计都在服务端完成，
+    每次重跑只把当前页和汇总统计发送到浏览器。
+    """
+    columns = [column for column in columns if column in df.columns]
+    if not columns:
+        st.info("请选择要显示的列")
+        return
+
+    # 筛选条件
+    categories = {}
+    date_range = None
+    filter_cols = st.columns(2)
+    if 'ts_code' in df.columns and df['ts_code'].nunique() > 1:
+        with filter_cols[0]:
+            categories['ts_code'] = st.multiselect(
+                column_names.get('ts_code', 'ts_code'),
+                sorted(df['ts_code'].unique()),
+                key=f"{key}_codes",
+                placeholder="全部"
+            )
+    if 'trade_date' in df.columns:
+        with filter_cols[1]:
+            date_range = st.date_input(
+                column_names.get('trade_date', 'trade_date'),
+                value=(df['trade_date'].min().date(), df['trade_date'].max().date()),
+                key=f"{key}_dates"
+            )
+    filtered = filter_frame(df, categories, date_range)
+
+    # 排序和分页
+    sort_options = columns if default_sort not in columns else [default_sort] + [c for c in columns if c != default_sort]
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        sort_by = st.selectbox("排序", sort_options, format_func=lambda c: column_names.get(c, c), key=f"{key}_sort")
+    with col2:
+        descending = st.toggle("降序", value=True, key=f"{key}_desc")
+    with col3:
+        page_size = st.selectbox("每页行数", PAGE_SIZES, key=f"{key}_size")
+    page_count = max(1, math.ceil(len(filtered) / page_size))
+    page_key = f"{key}_page"
+    # 页码只通过 session_state 设置初始值和收缩到有效范围（控件不再指定 value，避免重复设置的警告）
+    if page_key not in st.session_state:
+        st.session_state[page_key] = 1
+    elif st.session_state[page_key] > page_count:
+        st.session_state[page_key] = page_count
+    with col4:
+        page = st.number_input("页码", min_value=1, max_value=page_count, step=1, key=page_key)
+
+    st.caption(f"共 {len(filtered)} 行，第 {page}/{page_count} 页")
+    rows = page_frame(filtered, sort_by, not descending, page, page_size)
+    display = to_display_frame(rows, columns, column_names)
+    date_name = column_names.get('trade_date', 'trade_date')
+    with timer("render", "table"):
+        st.dataframe(
+            display,
+            use_container_width=True,
+            hide_index=True,
+            column_config={date_name: st.column_config.DateColumn(format="YYYY-MM-DD")}
+        )
+
+    # 筛选结果的汇总统计
+    numeric = [column for column in columns if pd.api.types.is_numeric_dtype(filtered[column])]
+    if numeric and not filtered.empty:
+        with st.expander("统计（全部筛选结果）"):
+            stats = filtered[numeric].agg(['min', 'max', 'mean'])
+            stats.columns = [column_names.get(column, column) for column in numeric]
+            stats.index = ['最小值', '最大值', '平均值']
+            st.dataframe(stats.round(2), use_container_width=True)
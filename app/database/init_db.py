@@ -1,14 +1,63 @@
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from app.config import ADMIN_USERNAME, ADMIN_PASSWORD, ADMIN_EMAIL
 from app.services.user import create_user, get_user_by_username
-from app.database.models import Base
 from app.database.session import engine
 
+# Alembic 配置文件位置（项目根目录）
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+# 引入迁移之前由 create_all 创建的数据库对应的版本
+BASELINE_REVISION = "0001"
+
+_schema_checked = False
+_schema_lock = threading.Lock()
+
+
+class SchemaOutdatedError(RuntimeError):
+    """数据库结构不是最新版本（需要先执行迁移）"""
+
+
+def get_alembic_config() -> Config:
+    """获取 Alembic 配置"""
+    config = Config(str(ALEMBIC_INI))
+    config.attributes["configure_logger"] = False
+    return config
+
+@lru_cache(maxsize=1)
+def get_head_revision() -> str:
+    """迁移脚本的最新版本（只读取脚本目录，不访问数据库）"""
+    return ScriptDirectory.from_config(get_alembic_config()).get_current_head()
+
+def get_current_revision() -> Optional[str]:
+    """数据库当前的迁移版本，未迁移过时返回 None"""
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except SQLAlchemyError:
+        return None
+
+def upgrade_schema() -> None:
+    """把数据库迁移到最新版本"""
+    config = get_alembic_config()
+    if get_current_revision() is None and inspect(engine).has_table("users"):
+        # 旧数据库已由 create_all 建表，先标记为基线版本再继续迁移
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
 def init_db(db: Session) -> None:
     """初始化数据库"""
-    # 创建所有表
-    Base.metadata.create_all(bind=engine)
-    
+    # 迁移到最新版本
+    upgrade_schema()
+
     # 创建管理员账户（如果不存在）
     admin = get_user_by_username(db, ADMIN_USERNAME)
     if not admin:
@@ -18,4 +67,26 @@ def init_db(db: Session) -> None:
             email=ADMIN_EMAIL,
             password=ADMIN_PASSWORD,
             is_admin=True
-        ) 
\ No newline at end of file
+        )
+
+def ensure_schema() -> None:
+    """检查数据库结构是否为最新版本（每个进程检查通过后不再检查）
+
+    只执行一次 SELECT 读取 alembic_version，不在应用进程中迁移：多个进程同时启动时会并发执行迁移。
+    迁移和创建管理员在部署时执行（alembic upgrade head 或 scripts/init_system.py）；
+    版本不一致时抛出 SchemaOutdatedError。
+    """
+    global _schema_checked
+    if _schema_checked:
+        return
+    with _schema_lock:
+        if _schema_checked:
+            return
+        current = get_current_revision()
+        head = get_head_revision()
+        if current != head:
+            raise SchemaOutdatedError(
+                f"数据库版本为 {current or '未初始化'}，最新版本为 {head}，"
+                "请先执行 python scripts/init_system.py（或 alembic upgrade head）"
+            )
+        _schema_checked = True
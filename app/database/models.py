@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -21,16 +21,31 @@ class User(Base):
     approvals_received = relationship("UserApproval", back_populates="user", foreign_keys="UserApproval.user_id")
     approvals_given = relationship("UserApproval", back_populates="approved_by_user", foreign_keys="UserApproval.approved_by")
 
+    # 关联自选股
+    watchlist = relationship("Watchlist", back_populates="user", cascade="all, delete-orphan")
+
 class UserApproval(Base):
     __tablename__ = "user_approvals"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     approved_by = Column(Integer, ForeignKey("users.id"), nullable=True)
-    status = Column(String(20), nullable=False)  # PENDING, APPROVED, REJECTED
+    status = Column(String(20), nullable=False, index=True)  # PENDING, APPROVED, REJECTED
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # 关联用户
     user = relationship("User", back_populates="approvals_received", foreign_keys=[user_id])
-    approved_by_user = relationship("User", back_populates="approvals_given", foreign_keys=[approved_by]) 
\ No newline at end of file
+    approved_by_user = relationship("User", back_populates="approvals_given", foreign_keys=[approved_by]) 
+
+class Watchlist(Base):
+    __tablename__ = "watchlists"
+    __table_args__ = (UniqueConstraint("user_id", "ts_code", name="uq_watchlists_user_code"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    ts_code = Column(String(20), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # 关联用户
+    user = relationship("User", back_populates="watchlist")
\ No newline at end of file
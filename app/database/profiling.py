@@ -0,0 +1,69 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# 每个脚本线程各自统计查询次数和耗时
+_stats = threading.local()
+
+
+def reset_query_stats() -> None:
+    """开始统计当前线程（一次脚本运行）的查询"""
+    _stats.count = 0
+    _stats.seconds = 0.0
+
+
+def get_query_stats() -> dict:
+    """当前线程自上次重置以来的查询次数和总耗时"""
+    return {
+        "count": getattr(_stats, "count", 0),
+        "ms": getattr(_stats, "seconds", 0.0) * 1000
+    }
+
+
+def log_query_stats(page: str) -> None:
+    """记录一次页面渲染执行的查询次数"""
+    stats = get_query_stats()
+    logger.info("Page %s ran %d queries in %.1fms", page, stats["count"], stats["ms"])
+
+
+def install_query_profiler(engine: Engine, slow_query_ms: float) -> None:
+    """在引擎上注册事件，统计查询次数并记录超过 slow_query_ms 的慢查询
+
+    开始时间记录在执行上下文上（同 install_query_metrics），出错的语句不会在连接上留下记录。
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        _stats.count = getattr(_stats, "count", 0) + 1
+        _stats.seconds = getattr(_stats, "seconds", 0.0) + elapsed
+        if elapsed * 1000 >= slow_query_ms:
+            logger.warning("Slow query (%.1fms): %s", elapsed * 1000, " ".join(statement.split()))
+
+
+def install_query_metrics(engine: Engine) -> None:
+    """在引擎上注册事件，按语句类型（SELECT/INSERT/UPDATE...）统计查询耗时
+
+    开始时间记录在每条语句的执行上下文上；语句出错时 after_cursor_execute 不会触发，
+    记录随上下文一起释放，不会留在连接池的连接上。
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_start
+        get_metrics().observe("db", statement.lstrip().split(None, 1)[0].upper(), elapsed)
@@ -1,17 +1,60 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from app.config import DATABASE_URL
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from app.config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_PROFILE,
+    DB_SLOW_QUERY_MS,
+    METRICS_ENABLED
+)
+from app.database.profiling import install_query_metrics, install_query_profiler
+
+def _engine_options(url: str) -> dict:
+    """连接池参数（SQLite 使用默认连接池，不支持这些参数）"""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING
+    }
 
 # 创建数据库引擎
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+
+if DB_PROFILE:
+    install_query_profiler(engine, DB_SLOW_QUERY_MS)
+if METRICS_ENABLED:
+    install_query_metrics(engine)
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 页面使用的会话（每个脚本线程一个，脚本运行结束时由 remove_session 释放）
+ScopedSession = scoped_session(SessionLocal)
+
+def get_session() -> Session:
+    """获取当前脚本运行的数据库会话
+
+    同一次运行中多次调用返回同一个会话；页面用完后调用 close() 可以提前把连接还给连接池，
+    之后再次使用时会自动重新获取连接。
+    """
+    return ScopedSession()
+
+def remove_session() -> None:
+    """脚本运行结束时关闭并移除当前线程的会话"""
+    ScopedSession.remove()
+
 def get_db():
     """获取数据库会话"""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
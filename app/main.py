@@ -1,11 +1,17 @@
 import streamlit as st
-from app.database.session import SessionLocal
-from app.database.init_db import init_db
+import logging
+from app.config import DB_PROFILE, METRICS_PORT
+from app.database.init_db import SchemaOutdatedError, ensure_schema
+from app.database.profiling import log_query_stats, reset_query_stats
+from app.database.session import remove_session
 from app.pages.login import login_page
 from app.pages.register import register_page
 from app.pages.admin import admin_page
 from app.pages.home import home_page
 from app.auth.middleware import check_auth
+from app.market.scheduler import start_prewarm_scheduler
+from app.market.tushare_client import get_tushare_client
+from app.metrics import start_metrics_server, timer
 
 # 设置页面配置
 st.set_page_config(
@@ -14,30 +20,48 @@ st.set_page_config(
     layout="wide"
 )
 
-# 初始化数据库
-db = SessionLocal()
+if DB_PROFILE:
+    logging.basicConfig(level=logging.INFO)
+
+# 检查数据库结构（迁移在部署时执行，版本不一致时提示并停止）
 try:
-    init_db(db)
-finally:
-    db.close()
+    ensure_schema()
+except SchemaOutdatedError as e:
+    st.error(str(e))
+    st.stop()
+
+# 启动自选股预热调度（每个进程只启动一次）
+start_prewarm_scheduler(get_tushare_client(st.secrets["TUSHARE_TOKEN"]))
+
+# 启动 Prometheus 指标端点（每个进程只启动一次）
+start_metrics_server(METRICS_PORT)
 
 # 页面路由
 def main():
     # 获取当前页面
     page = st.query_params.get("page", "")
 
-    # 检查认证状态
-    is_authenticated = check_auth()
-    
-    # 路由到相应的页面
-    if page == "register" and not is_authenticated:
-        register_page()
-    elif page == "admin" and is_authenticated:
-        admin_page()
-    elif is_authenticated:
-        home_page()  # 已登录用户默认显示主页
-    else:
-        login_page()  # 未登录用户显示登录页面
+    reset_query_stats()
+    try:
+        # 整次脚本运行的耗时（st.rerun 中断的运行同样记录；未知的 page 参数记为 home，避免标签无限增长）
+        with timer("page", page if page in ("register", "admin") else "home"):
+            # 检查认证状态
+            is_authenticated = check_auth()
+
+            # 路由到相应的页面
+            if page == "register" and not is_authenticated:
+                register_page()
+            elif page == "admin" and is_authenticated:
+                admin_page()
+            elif is_authenticated:
+                home_page()  # 已登录用户默认显示主页
+            else:
+                login_page()  # 未登录用户显示登录页面
+    finally:
+        if DB_PROFILE:
+            log_query_stats(page or "home")
+        # 每次脚本运行结束后释放会话，连接归还连接池
+        remove_session()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
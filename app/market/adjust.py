@@ -0,0 +1,68 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.market.tushare_client import TushareClient
+
+# 复权方式：None 不复权，qfq 前复权（以最新复权因子为基准），hfq 后复权
+ADJUST_NAMES = {
+    None: '不复权',
+    'qfq': '前复权',
+    'hfq': '后复权'
+}
+
+# 按复权因子调整的价格列
+ADJUST_PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'pre_close', 'change']
+
+# 复权计算依赖的日线列
+ADJUST_COLUMNS = ['trade_date', 'adj_factor']
+
+
+def fill_adj_factor(factors: pd.Series) -> pd.Series:
+    """补齐缺失的复权因子（沿用相邻交易日的因子，完全缺失时视为 1）"""
+    return factors.ffill().bfill().fillna(1.0)
+
+
+def merge_adj_factor(bars: pd.DataFrame, factors: pd.DataFrame) -> pd.DataFrame:
+    """把复权因子合并到日线（按股票代码和交易日对齐）"""
+    if bars.empty:
+        return bars
+    keys = ['ts_code', 'trade_date'] if 'ts_code' in factors.columns else ['trade_date']
+    if factors.empty:
+        return bars.assign(adj_factor=np.nan)
+    return bars.merge(factors[keys + ['adj_factor']], on=keys, how='left')
+
+
+def fetch_bars(client: TushareClient, ts_code: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """拉取单只股票的日线及复权因子（两个请求并发提交）"""
+    daily = client.submit("daily", ts_code=ts_code, start_date=start_date, end_date=end_date)
+    factors = client.submit("adj_factor", ts_code=ts_code, start_date=start_date, end_date=end_date)
+    bars = merge_adj_factor(daily.result().copy(), factors.result())
+    if not bars.empty:
+        # 接口按日期降序返回，按升序补齐缺失的因子
+        bars = bars.sort_values('trade_date', ignore_index=True)
+        bars['adj_factor'] = fill_adj_factor(bars['adj_factor'])
+    return bars
+
+
+def adjust_prices(bars: pd.DataFrame, adj: Optional[str], base_factor: Optional[float] = None) -> pd.DataFrame:
+    """按复权因子调整价格列（向量化，不访问接口）
+
+    后复权：价格 × 复权因子；前复权：价格 × 复权因子 / base_factor（默认为 bars 中最新的因子）。
+    涨跌幅和成交量不受复权影响。
+    """
+    if adj is None or bars.empty:
+        return bars
+    if adj not in ADJUST_NAMES:
+        raise ValueError(f"未知的复权方式: {adj}")
+
+    factors = fill_adj_factor(bars['adj_factor']).to_numpy(dtype=float)
+    if adj == 'qfq':
+        if base_factor is None:
+            base_factor = factors[np.argmax(bars['trade_date'].to_numpy())]
+        factors = factors / base_factor
+
+    columns = [column for column in ADJUST_PRICE_COLUMNS if column in bars.columns]
+    adjusted = bars[columns].to_numpy(dtype=float) * factors[:, None]
+    return bars.assign(**{column: adjusted[:, i] for i, column in enumerate(columns)})
@@ -0,0 +1,254 @@
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.config import BACKTEST_WORKERS
+from app.market.indicators import VOL_RATIO_WINDOW, WARMUP_DAYS, rolling_mean
+from app.market.store import get_bar_store, shift_date
+
+# 年化使用的交易日数
+TRADING_DAYS_PER_YEAR = 252
+
+# 面板数组（共享给参数扫描的工作进程）
+PANEL_ARRAYS = ["dates", "date_index", "close", "vol"]
+
+
+@dataclass
+class BarPanel:
+    """左对齐的日线面板
+
+    每列一只股票，按该股票自身的交易序号排列（停牌日不占行，与指标的计算方式一致），
+    有效数据位于每列前部，之后补 NaN。date_index 记录每个位置对应 dates 的下标（补齐部分为 -1）。
+    close 为后复权收盘价，收益率不受除权除息影响。
+    """
+    ts_codes: List[str]
+    dates: np.ndarray  # 全部交易日（升序，YYYYMMDD）
+    date_index: np.ndarray  # (交易序号 × 股票)
+    close: np.ndarray  # (交易序号 × 股票)
+    vol: np.ndarray  # (交易序号 × 股票)
+    start_date: str  # 回测起点，之前的数据只用于指标预热
+
+    def select(self, columns: slice) -> "BarPanel":
+        """取出部分股票"""
+        return BarPanel(
+            self.ts_codes[columns],
+            self.dates,
+            self.date_index[:, columns],
+            self.close[:, columns],
+            self.vol[:, columns],
+            self.start_date
+        )
+
+
+@dataclass(frozen=True)
+class MACrossSignal:
+    """均线交叉：快线在慢线之上时持有"""
+    fast: int = 5
+    slow: int = 20
+
+    def positions(self, panel: BarPanel) -> np.ndarray:
+        return rolling_mean(panel.close, self.fast) > rolling_mean(panel.close, self.slow)
+
+
+@dataclass(frozen=True)
+class VolumeBreakoutSignal:
+    """放量突破：量比不低于 threshold 且收涨时买入，持有 hold_days 个交易日"""
+    threshold: float = 2.0
+    hold_days: int = 5
+
+    def positions(self, panel: BarPanel) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vol_ratio = panel.vol / rolling_mean(panel.vol, VOL_RATIO_WINDOW)
+        rising = np.zeros(panel.close.shape, dtype=bool)
+        rising[1:] = panel.close[1:] > panel.close[:-1]
+        entries = (vol_ratio >= self.threshold) & rising
+
+        # 最近 hold_days 个交易日内出现过买入信号即持有
+        counts = np.zeros((entries.shape[0] + 1,) + entries.shape[1:], dtype=np.int32)
+        np.cumsum(entries, axis=0, out=counts[1:])
+        window_start = np.maximum(np.arange(entries.shape[0]) + 1 - self.hold_days, 0)
+        return (counts[1:] - counts[window_start]) > 0
+
+
+@dataclass
+class BacktestResult:
+    """回测结果"""
+    summary: Dict[str, float]  # 组合汇总指标
+    daily: pd.DataFrame  # 组合每日收益、净值、回撤、换手率和持仓数
+    symbols: pd.DataFrame  # 每只股票的收益、最大回撤、交易次数和持仓比例
+
+
+def _read_bars(ts_code: str, start_date: Optional[str], end_date: Optional[str]) -> pd.DataFrame:
+    bars = get_bar_store().read(ts_code, start_date, end_date, columns=["trade_date", "close", "vol", "adj_factor"])
+    if bars.empty:
+        return bars
+    if "adj_factor" in bars.columns:
+        factors = bars["adj_factor"].ffill().bfill().fillna(1.0)
+        bars["close"] = bars["close"] * factors
+    return bars
+
+
+def load_panel(
+    ts_codes: Optional[List[str]] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    io_workers: int = 8
+) -> BarPanel:
+    """从本地日线存储加载回测面板（不访问接口）
+
+    起点之前额外加载 WARMUP_DAYS 的数据用于计算均线；ts_codes 默认为本地已存储的全部股票。
+    """
+    ts_codes = list(ts_codes) if ts_codes is not None else get_bar_store().symbols()
+    load_start = shift_date(start_date, -WARMUP_DAYS) if start_date else None
+    with ThreadPoolExecutor(max_workers=io_workers) as executor:
+        frames = list(executor.map(lambda code: _read_bars(code, load_start, end_date), ts_codes))
+
+    kept = [(code, bars) for code, bars in zip(ts_codes, frames) if not bars.empty]
+    if not kept:
+        raise ValueError("本地没有可用于回测的日线数据")
+    codes = [code for code, _ in kept]
+    frames = [bars for _, bars in kept]
+    lengths = np.array([len(bars) for bars in frames])
+
+    trade_dates = np.concatenate([bars["trade_date"].to_numpy(dtype=str) for bars in frames])
+    dates = np.unique(trade_dates)
+
+    # 长表位置 -> (交易序号, 股票)
+    columns = np.repeat(np.arange(len(frames)), lengths)
+    rows = np.arange(len(columns)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    shape = (lengths.max(), len(frames))
+
+    date_index = np.full(shape, -1, dtype=np.int32)
+    date_index[rows, columns] = np.searchsorted(dates, trade_dates)
+    close = np.full(shape, np.nan)
+    close[rows, columns] = np.concatenate([bars["close"].to_numpy(dtype=float) for bars in frames])
+    vol = np.full(shape, np.nan)
+    vol[rows, columns] = np.concatenate([bars["vol"].to_numpy(dtype=float) for bars in frames])
+
+    return BarPanel(codes, dates, date_index, close, vol, start_date or str(dates[0]))
+
+
+def _max_drawdown(returns: np.ndarray) -> np.ndarray:
+    """按列计算最大回撤（returns 为每期收益率）"""
+    equity = np.cumprod(1.0 + returns, axis=0)
+    peak = np.maximum.accumulate(equity, axis=0)
+    return (equity / peak - 1.0).min(axis=0)
+
+
+def run_backtest(panel: BarPanel, signal, cost: float = 0.0, batch_size: int = 1000) -> BacktestResult:
+    """对面板中的所有股票运行回测（全部为 NumPy 向量化运算）
+
+    signal.positions(panel) 给出每个交易日收盘时的目标持仓（0/1），次一交易日起生效；
+    cost 为单边交易成本（按成交金额比例）。组合每天等权持有所有持仓股票（当日停牌的股票不计入）。
+    为控制内存，按 batch_size 只股票分批计算后汇总。
+    """
+    num_dates = len(panel.dates)
+    start_index = np.searchsorted(panel.dates, panel.start_date)
+    gross = np.zeros(num_dates)
+    held_count = np.zeros(num_dates)
+    trades_count = np.zeros(num_dates)
+    symbol_stats = []
+
+    for first in range(0, len(panel.ts_codes), batch_size):
+        batch = panel.select(slice(first, first + batch_size))
+        valid = batch.date_index >= 0
+        in_range = valid & (batch.date_index >= start_index)
+
+        # 相邻两个交易日之间的收益率（停牌日不占行）
+        returns = np.zeros(batch.close.shape)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns[1:] = batch.close[1:] / batch.close[:-1] - 1.0
+        returns[~in_range | ~np.isfinite(returns)] = 0.0
+
+        # 收盘信号次日生效
+        held = np.zeros(batch.close.shape)
+        held[1:] = signal.positions(batch)[:-1]
+        held[~in_range] = 0.0
+        trades = np.abs(np.diff(held, axis=0, prepend=0.0))
+        strategy = held * returns - cost * trades
+
+        symbol_stats.append(pd.DataFrame({
+            "ts_code": batch.ts_codes,
+            "total_return": np.expm1(np.log1p(strategy).sum(axis=0)),
+            "max_drawdown": _max_drawdown(strategy),
+            "trades": trades.sum(axis=0),
+            "exposure": held.sum(axis=0) / np.maximum(in_range.sum(axis=0), 1)
+        }))
+
+        # 按交易日汇总到组合
+        index = batch.date_index[in_range]
+        gross += np.bincount(index, weights=(held * returns)[in_range], minlength=num_dates)
+        held_count += np.bincount(index, weights=held[in_range], minlength=num_dates)
+        trades_count += np.bincount(index, weights=trades[in_range], minlength=num_dates)
+
+    held_count = held_count[start_index:]
+    turnover = trades_count[start_index:] / np.maximum(held_count, 1.0)
+    portfolio = gross[start_index:] / np.maximum(held_count, 1.0) - cost * turnover
+    equity = np.cumprod(1.0 + portfolio)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+
+    years = max(len(portfolio) / TRADING_DAYS_PER_YEAR, 1e-9)
+    volatility = portfolio.std() * np.sqrt(TRADING_DAYS_PER_YEAR)
+    summary = {
+        "total_return": float(equity[-1] - 1.0) if len(equity) else 0.0,
+        "annual_return": float(equity[-1] ** (1.0 / years) - 1.0) if len(equity) else 0.0,
+        "annual_volatility": float(volatility),
+        "sharpe": float(portfolio.mean() * TRADING_DAYS_PER_YEAR / volatility) if volatility > 0 else 0.0,
+        "max_drawdown": float(drawdown.min()) if len(drawdown) else 0.0,
+        "avg_turnover": float(turnover.mean()) if len(turnover) else 0.0,
+        "avg_positions": float(held_count.mean()) if len(held_count) else 0.0
+    }
+    daily = pd.DataFrame({
+        "trade_date": panel.dates[start_index:],
+        "return": portfolio,
+        "equity": equity,
+        "drawdown": drawdown,
+        "turnover": turnover,
+        "positions": held_count
+    })
+    return BacktestResult(summary, daily, pd.concat(symbol_stats, ignore_index=True))
+
+
+# 参数扫描工作进程中的面板（通过内存映射共享，不在进程间复制）
+_worker_panel: Optional[BarPanel] = None
+
+
+def _init_sweep_worker(directory: str, ts_codes: List[str], start_date: str) -> None:
+    global _worker_panel
+    arrays = {name: np.load(Path(directory) / f"{name}.npy", mmap_mode="r") for name in PANEL_ARRAYS}
+    _worker_panel = BarPanel(ts_codes, start_date=start_date, **arrays)
+
+
+def _run_sweep_task(signal, cost: float) -> Dict[str, float]:
+    return run_backtest(_worker_panel, signal, cost).summary
+
+
+def sweep(panel: BarPanel, signals: Sequence, cost: float = 0.0, workers: int = BACKTEST_WORKERS) -> pd.DataFrame:
+    """在进程池中并行回测多组参数，返回每组参数的汇总指标
+
+    面板数组写入临时目录，各工作进程以内存映射方式只读共享。
+    """
+    with tempfile.TemporaryDirectory(prefix="backtest-") as directory:
+        for name in PANEL_ARRAYS:
+            np.save(Path(directory) / f"{name}.npy", getattr(panel, name))
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_sweep_worker,
+            initargs=(directory, panel.ts_codes, panel.start_date)
+        ) as executor:
+            futures = [executor.submit(_run_sweep_task, signal, cost) for signal in signals]
+            summaries = [future.result() for future in futures]
+
+    rows = [
+        {"strategy": type(signal).__name__, **asdict(signal), **summary}
+        for signal, summary in zip(signals, summaries)
+    ]
+    return pd.DataFrame(rows).sort_values("sharpe", ascending=False, ignore_index=True)
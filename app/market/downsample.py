@@ -0,0 +1,92 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 重采样周期：(名称, pandas 频率)，按从细到粗的顺序尝试
+RESAMPLE_RULES = [("日线", None), ("周线", "W-FRI"), ("月线", "ME")]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets 降采样，返回保留点的下标
+
+    首尾两点总是保留；中间的点按桶划分，每个桶保留与前一个保留点、
+    下一个桶均值构成三角形面积最大的点，尽量保持折线的形状。
+    y 中的 NaN（如均线的预热期）所在位置不参与选点。
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = x.astype(float)
+    y = y.astype(float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        next_y = y[next_start:next_end]
+        valid = ~np.isnan(next_y)
+        avg_x = x[next_start:next_end][valid].mean() if valid.any() else x[next_start]
+        avg_y = next_y[valid].mean() if valid.any() else np.nan
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        if np.isnan(area).all():
+            a = start
+        else:
+            a = start + int(np.nanargmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def resample_ohlc(df: pd.DataFrame, rule: str, line_columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """把日线（单只股票，按日期升序）重采样为周线或月线
+
+    开盘取首日、收盘取末日、最高最低取极值、成交量求和；
+    均线等折线列取周期最后一个交易日的值。日期为周期内最后一个交易日。
+    """
+    aggregations = {
+        'trade_date': 'last',
+        'open': 'first',
+        'high': 'max',
+        'low': 'min',
+        'close': 'last'
+    }
+    if 'vol' in df.columns:
+        aggregations['vol'] = 'sum'
+        # 紧凑类型的成交量求和可能溢出
+        df = df.astype({'vol': np.int64})
+    for column in line_columns or []:
+        aggregations[column] = 'last'
+
+    grouped = df.groupby(pd.Grouper(key='trade_date', freq=rule))
+    bars = grouped.agg({column: how for column, how in aggregations.items() if column != 'trade_date'})
+    bars['trade_date'] = grouped['trade_date'].last()
+    return bars.dropna(subset=['close']).reset_index(drop=True)
+
+
+def downsample_bars(
+    df: pd.DataFrame,
+    max_points: int,
+    line_columns: Optional[List[str]] = None
+) -> Tuple[str, pd.DataFrame]:
+    """选择点数不超过 max_points 的最细周期，返回 (周期名称, 数据)
+
+    月线仍超过 max_points 时（几十年的区间），对月线按收盘价做 LTTB 降采样。
+    """
+    df = df.sort_values('trade_date', ignore_index=True)
+    for name, rule in RESAMPLE_RULES:
+        bars = df if rule is None else resample_ohlc(df, rule, line_columns)
+        if len(bars) <= max_points:
+            return name, bars
+
+    x = bars['trade_date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    keep = lttb(x, bars['close'].to_numpy(), max_points)
+    return name, bars.iloc[keep].reset_index(drop=True)
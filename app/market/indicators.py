@@ -0,0 +1,423 @@
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.config import INDICATOR_STORE_DIR
+from app.market.adjust import ADJUST_PRICE_COLUMNS, adjust_prices
+from app.market.store import get_bar_store, shift_date, write_table_atomic
+from app.metrics import timer
+
+# 均线周期
+MA_WINDOWS = [3, 5, 10, 20, 30, 50, 120]
+
+# 量比周期（当日成交量/过去5日平均成交量）
+VOL_RATIO_WINDOW = 5
+
+# 对外提供的指标列
+INDICATOR_COLUMNS = [f"ma{window}" for window in MA_WINDOWS] + ["price_range", "vol_ratio", "amplitude"]
+
+# 增量更新需要的中间状态列（不对外提供）
+STATE_COLUMNS = ["vol_ma5"]
+
+# 查询时向前多取的自然日数，保证 MA120 在查询起点已有完整的历史窗口
+WARMUP_DAYS = 250
+
+# 指标文件元数据：计算时使用的日线范围、条数、内容校验和及日线文件的版本标识
+BARS_FIRST_KEY = b"bars_first"
+BARS_LAST_KEY = b"bars_last"
+BARS_COUNT_KEY = b"bars_count"
+BARS_CHECKSUM_KEY = b"bars_checksum"
+BARS_SIGNATURE_KEY = b"bars_signature"
+
+# 参与指标计算的日线列（校验和覆盖这些列）
+BAR_INPUT_COLUMNS = ["trade_date", "open", "high", "low", "close", "vol"]
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """用累积和差分沿第一维计算滑动平均，窗口未满或窗口内有缺失值时为 NaN
+
+    支持一维序列，也支持 (交易序号 × 股票) 的二维数组（每列独立计算）。
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.full(values.shape, np.nan)
+    if values.shape[0] < window:
+        return result
+
+    missing = np.isnan(values)
+    sums = np.zeros((values.shape[0] + 1,) + values.shape[1:])
+    np.cumsum(np.where(missing, 0.0, values), axis=0, out=sums[1:])
+    result[window - 1:] = (sums[window:] - sums[:-window]) / window
+
+    if missing.any():
+        counts = np.zeros(sums.shape, dtype=np.int32)
+        np.cumsum(missing, axis=0, out=counts[1:])
+        result[window - 1:][(counts[window:] - counts[:-window]) > 0] = np.nan
+    return result
+
+
+def extend_rolling_mean(values: np.ndarray, previous_mean: float, start: int, window: int) -> np.ndarray:
+    """增量计算 values[start:] 的滑动平均
+
+    previous_mean 为第 start-1 行的均值，之后每个新数据点只做一次加减（O(1)），
+    上一行均值无效时才对窗口重新求和。
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.full(len(values) - start, np.nan)
+    total = previous_mean * window
+    for i in range(start, len(values)):
+        if i + 1 < window:
+            continue
+        if np.isnan(total):
+            total = values[i - window + 1:i + 1].sum()
+        else:
+            total += values[i] - values[i - window]
+        result[i - start] = total / window
+    return result
+
+
+def compute_indicators(bars: pd.DataFrame) -> pd.DataFrame:
+    """基于完整日线历史计算全部指标（bars 需按日期升序）"""
+    close = bars["close"].to_numpy(dtype=float)
+    vol = bars["vol"].to_numpy(dtype=float)
+
+    data = {"trade_date": bars["trade_date"].to_numpy()}
+    for window in MA_WINDOWS:
+        data[f"ma{window}"] = rolling_mean(close, window)
+
+    # 最高最低差价
+    data["price_range"] = bars["high"].to_numpy(dtype=float) - bars["low"].to_numpy(dtype=float)
+
+    # 量比
+    data["vol_ma5"] = rolling_mean(vol, VOL_RATIO_WINDOW)
+    data["vol_ratio"] = vol / data["vol_ma5"]
+
+    # T幅度差 (收盘价 - 开盘价)
+    data["amplitude"] = close - bars["open"].to_numpy(dtype=float)
+    return pd.DataFrame(data)
+
+
+def bar_row_hashes(bars: pd.DataFrame) -> np.ndarray:
+    """逐行计算参与指标计算的日线列的哈希"""
+    return pd.util.hash_pandas_object(bars[BAR_INPUT_COLUMNS], index=False).to_numpy()
+
+
+def bars_checksum(row_hashes: np.ndarray) -> str:
+    """日线内容的校验和（按行顺序），用于判断已计算的部分是否被修改"""
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).hexdigest()
+
+
+def update_indicators(indicators: pd.DataFrame, bars: pd.DataFrame) -> pd.DataFrame:
+    """新日线到达后增量追加指标
+
+    indicators 对应 bars 的前 len(indicators) 行，只为之后的新行计算指标。
+    """
+    start = len(indicators)
+    if start == 0:
+        return compute_indicators(bars)
+
+    last = indicators.iloc[-1]
+    new_bars = bars.iloc[start:]
+    close = bars["close"].to_numpy(dtype=float)
+    vol = bars["vol"].to_numpy(dtype=float)
+
+    data = {"trade_date": new_bars["trade_date"].to_numpy()}
+    for window in MA_WINDOWS:
+        data[f"ma{window}"] = extend_rolling_mean(close, last[f"ma{window}"], start, window)
+
+    data["price_range"] = new_bars["high"].to_numpy(dtype=float) - new_bars["low"].to_numpy(dtype=float)
+    data["vol_ma5"] = extend_rolling_mean(vol, last["vol_ma5"], start, VOL_RATIO_WINDOW)
+    data["vol_ratio"] = vol[start:] / data["vol_ma5"]
+    data["amplitude"] = close[start:] - new_bars["open"].to_numpy(dtype=float)
+    return pd.concat([indicators, pd.DataFrame(data)], ignore_index=True)
+
+
+def compute_market_indicators(bars: pd.DataFrame) -> pd.DataFrame:
+    """全市场批量计算指标
+
+    bars 为多只股票的长表，每只股票的日线需按日期升序（不同股票的行可以交错）。
+    每只股票按自身交易序号左对齐，排成 (交易序号 × 股票) 的二维数组，停牌日
+    不会进入滑动窗口；所有均线和派生列在二维数组上一次性向量化计算，结果按
+    bars 的行顺序返回。
+    """
+    codes, ts_codes = pd.factorize(bars["ts_code"])
+    positions = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+    shape = (positions.max() + 1, len(ts_codes))
+
+    def to_panel(values: np.ndarray) -> np.ndarray:
+        panel = np.full(shape, np.nan)
+        panel[positions, codes] = values
+        return panel
+
+    close = bars["close"].to_numpy(dtype=float)
+    vol = bars["vol"].to_numpy(dtype=float)
+    close_panel = to_panel(close)
+
+    data = {
+        "ts_code": bars["ts_code"].to_numpy(),
+        "trade_date": bars["trade_date"].to_numpy()
+    }
+    for window in MA_WINDOWS:
+        data[f"ma{window}"] = rolling_mean(close_panel, window)[positions, codes]
+    del close_panel
+
+    data["price_range"] = bars["high"].to_numpy(dtype=float) - bars["low"].to_numpy(dtype=float)
+    data["vol_ma5"] = rolling_mean(to_panel(vol), VOL_RATIO_WINDOW)[positions, codes]
+    data["vol_ratio"] = vol / data["vol_ma5"]
+    data["amplitude"] = close - bars["open"].to_numpy(dtype=float)
+    return pd.DataFrame(data)
+
+
+@dataclass(frozen=True)
+class IndicatorState:
+    """计算指标时使用的日线（元数据中没有的字段为 None）"""
+    first: str
+    last: str
+    count: int
+    checksum: Optional[str] = None
+    signature: Optional[str] = None
+
+
+class IndicatorStore:
+    """按股票代码分区的指标存储
+
+    指标基于本地存储的完整日线历史计算并持久化，日线追加后只增量计算新行；
+    日线历史向前回补或被修改（校验和不一致）时整体重算。
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[str, threading.RLock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, ts_code: str) -> Path:
+        return self.root / f"{ts_code}.parquet"
+
+    def _lock(self, ts_code: str) -> threading.RLock:
+        with self._locks_guard:
+            return self._locks.setdefault(ts_code, threading.RLock())
+
+    def state(self, ts_code: str) -> Optional[IndicatorState]:
+        """获取计算指标时使用的日线"""
+        path = self._path(ts_code)
+        if not path.exists():
+            return None
+        metadata = pq.read_schema(path).metadata or {}
+        if BARS_COUNT_KEY not in metadata:
+            return None
+        optional = {
+            key: metadata[raw].decode() if raw in metadata else None
+            for key, raw in (("checksum", BARS_CHECKSUM_KEY), ("signature", BARS_SIGNATURE_KEY))
+        }
+        return IndicatorState(
+            metadata[BARS_FIRST_KEY].decode(),
+            metadata[BARS_LAST_KEY].decode(),
+            int(metadata[BARS_COUNT_KEY]),
+            **optional
+        )
+
+    def read(
+        self,
+        ts_code: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """读取指定日期区间的指标（按日期升序）"""
+        path = self._path(ts_code)
+        if not path.exists():
+            return pd.DataFrame()
+
+        filters = []
+        if start_date:
+            filters.append(("trade_date", ">=", start_date))
+        if end_date:
+            filters.append(("trade_date", "<=", end_date))
+        if columns is not None and "trade_date" not in columns:
+            columns = ["trade_date"] + list(columns)
+        return pq.read_table(path, columns=columns, filters=filters or None).to_pandas()
+
+    def write(self, ts_code: str, indicators: pd.DataFrame, checksum: str, signature: Optional[str]) -> None:
+        """写入指标，并记录对应日线的范围、校验和及日线文件的版本标识"""
+        table = pa.Table.from_pandas(indicators, preserve_index=False)
+        metadata = {
+            BARS_FIRST_KEY: str(indicators["trade_date"].iat[0]).encode(),
+            BARS_LAST_KEY: str(indicators["trade_date"].iat[-1]).encode(),
+            BARS_COUNT_KEY: str(len(indicators)).encode(),
+            BARS_CHECKSUM_KEY: checksum.encode()
+        }
+        if signature is not None:
+            metadata[BARS_SIGNATURE_KEY] = signature.encode()
+        table = table.replace_schema_metadata(metadata)
+        with self._lock(ts_code):
+            write_table_atomic(table, self._path(ts_code))
+
+    def refresh(self, ts_code: str) -> None:
+        """使指标与本地日线保持同步
+
+        日线文件的版本标识未变时直接返回（只读取文件状态）；变化时按校验和判断：
+        已计算的部分未修改时只为追加的新行增量计算（没有新行时只更新标识），否则整体重算。
+        """
+        bar_store = get_bar_store()
+        with self._lock(ts_code):
+            state = self.state(ts_code)
+            # 先取版本标识再读取：读取期间日线被改写时，下次刷新会重新检查
+            signature = bar_store.signature(ts_code)
+            if signature is None or (state and state.signature == signature):
+                return
+
+            bars = bar_store.read(ts_code)
+            if bars.empty:
+                return
+
+            row_hashes = bar_row_hashes(bars)
+            dates = bars["trade_date"]
+            unchanged = (
+                state is not None
+                and state.checksum is not None
+                and state.first == dates.iat[0]
+                and state.count <= len(bars)
+                and dates.iat[state.count - 1] == state.last
+                and bars_checksum(row_hashes[:state.count]) == state.checksum
+            )
+            if unchanged and state.count == len(bars):
+                indicators = self.read(ts_code)
+            elif unchanged:
+                indicators = update_indicators(self.read(ts_code), bars)
+            else:
+                indicators = compute_indicators(bars)
+            self.write(ts_code, indicators, bars_checksum(row_hashes), signature)
+
+
+# 创建指标存储
+indicator_store = IndicatorStore(INDICATOR_STORE_DIR)
+
+def get_indicator_store() -> IndicatorStore:
+    """获取指标存储"""
+    return indicator_store
+
+
+def rebuild_market_indicators(ts_codes: Optional[List[str]] = None, batch_size: int = 1000) -> int:
+    """从本地日线批量重建全市场指标，返回处理的股票数
+
+    每批 batch_size 只股票做一次向量化计算，控制内存峰值。
+    """
+    bar_store = get_bar_store()
+    ts_codes = ts_codes if ts_codes is not None else bar_store.symbols()
+
+    rebuilt = 0
+    for i in range(0, len(ts_codes), batch_size):
+        frames = []
+        signatures = []
+        for ts_code in ts_codes[i:i + batch_size]:
+            signature = bar_store.signature(ts_code)
+            bars = bar_store.read(ts_code, columns=BAR_INPUT_COLUMNS)
+            if not bars.empty:
+                frames.append(bars.assign(ts_code=ts_code))
+                signatures.append(signature)
+        if not frames:
+            continue
+
+        indicators = compute_market_indicators(pd.concat(frames, ignore_index=True))
+        indicators = indicators.drop(columns="ts_code")
+        offset = 0
+        for bars, signature in zip(frames, signatures):
+            indicator_store.write(
+                bars["ts_code"].iat[0],
+                indicators.iloc[offset:offset + len(bars)],
+                bars_checksum(bar_row_hashes(bars)),
+                signature
+            )
+            offset += len(bars)
+        rebuilt += len(frames)
+    return rebuilt
+
+
+def get_indicator_frame(
+    ts_code: str,
+    start_date: str,
+    end_date: str,
+    fetch: Callable[[str, str], pd.DataFrame],
+    columns: Optional[List[str]] = None,
+    adj: Optional[str] = None
+) -> pd.DataFrame:
+    """获取带技术指标的日线数据
+
+    指标基于完整历史预先计算，查询只对预计算的列做切片；
+    查询起点之前会预留 WARMUP_DAYS 的历史，保证长周期均线在起点即有值。
+    指定 columns 时只读取所需的日线列和指标列（总是包含 trade_date），未请求指标时不读取指标文件。
+    adj 为 qfq/hfq 时返回复权价格，指标基于复权价格现算。
+    """
+    if adj is not None:
+        return get_adjusted_indicator_frame(ts_code, start_date, end_date, fetch, columns, adj)
+
+    if columns is None:
+        bar_columns, indicator_columns = None, INDICATOR_COLUMNS
+    else:
+        indicator_columns = [column for column in INDICATOR_COLUMNS if column in columns]
+        bar_columns = ["trade_date"] + [
+            column for column in columns
+            if column != "trade_date" and column not in INDICATOR_COLUMNS
+        ]
+
+    bar_store = get_bar_store()
+    bar_store.ensure(ts_code, shift_date(start_date, -WARMUP_DAYS), end_date, fetch)
+
+    # 本地存储读取、指标切片与合并（补拉数据的耗时记在 fetch 阶段）
+    with timer("compute", "indicators"):
+        bars = bar_store.read(ts_code, start_date, end_date, columns=bar_columns)
+        if bars.empty or not indicator_columns:
+            return bars
+        indicator_store.refresh(ts_code)
+        indicators = indicator_store.read(ts_code, start_date, end_date, columns=indicator_columns)
+        df = bars.merge(indicators, on="trade_date", how="left")
+        df[indicator_columns] = df[indicator_columns].round(2)
+        return df
+
+
+def get_adjusted_indicator_frame(
+    ts_code: str,
+    start_date: str,
+    end_date: str,
+    fetch: Callable[[str, str], pd.DataFrame],
+    columns: Optional[List[str]],
+    adj: str
+) -> pd.DataFrame:
+    """获取复权价格及基于复权价格计算的技术指标
+
+    复权因子与日线一起存储在本地，复权只是内存中的向量化计算；
+    均线等指标随复权价格变化，基于预热区间的日线现算。
+    """
+    bar_store = get_bar_store()
+    bar_store.ensure(ts_code, shift_date(start_date, -WARMUP_DAYS), end_date, fetch)
+    # 旧版本存储的日线没有复权因子，一次性补齐
+    bar_store.ensure_column(ts_code, "adj_factor", fetch)
+
+    with timer("compute", "adjusted"):
+        history = bar_store.read(ts_code, shift_date(start_date, -WARMUP_DAYS), end_date)
+        if history.empty:
+            return history
+
+        base_factor = None
+        if adj == "qfq":
+            # 前复权以本地最新的复权因子为基准，最新价格与不复权一致
+            factors = bar_store.read(ts_code, columns=["trade_date", "adj_factor"])
+            base_factor = factors["adj_factor"].dropna().iloc[-1] if factors["adj_factor"].notna().any() else None
+        adjusted = adjust_prices(history, adj, base_factor)
+
+        indicators = compute_indicators(adjusted).drop(columns=["trade_date"] + STATE_COLUMNS)
+        df = pd.concat([adjusted.reset_index(drop=True), indicators], axis=1)
+        df = df[df["trade_date"] >= start_date].reset_index(drop=True)
+
+        rounded = [column for column in ADJUST_PRICE_COLUMNS if column in df.columns] + INDICATOR_COLUMNS
+        df[rounded] = df[rounded].round(2)
+        if columns is not None:
+            df = df[["trade_date"] + [column for column in columns if column != "trade_date" and column in df.columns]]
+        return df
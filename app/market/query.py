@@ -0,0 +1,192 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config import BATCH_QUERY_WORKERS, EXPORT_PREFETCH
+from app.market.adjust import fetch_bars
+from app.market.indicators import INDICATOR_COLUMNS, get_indicator_frame
+from app.market.symbols import get_symbol_registry
+from app.market.tushare_client import TushareClient
+from app.metrics import timed
+from app.redis.cache import get_first_frame, set_frame
+
+# 批量查询线程池（所有会话共享）
+_executor = ThreadPoolExecutor(max_workers=BATCH_QUERY_WORKERS, thread_name_prefix="stock-query")
+
+
+# 结果数据的紧凑类型：价格类 float32，成交量整数，日期 datetime64，代码和名称为分类
+FLOAT_COLUMNS = ['open', 'close', 'high', 'low', 'pct_chg', 'turnover_rate'] + INDICATOR_COLUMNS
+VOLUME_COLUMNS = ['vol']
+CATEGORY_COLUMNS = ['ts_code', 'stock_name']
+
+
+@timed("transform")
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """把结果转换为紧凑的数据类型（已是紧凑类型的列不会重复转换）"""
+    dtypes = {column: np.float32 for column in FLOAT_COLUMNS if column in df.columns}
+    dtypes.update({column: 'category' for column in CATEGORY_COLUMNS if column in df.columns})
+    df = df.astype(dtypes)
+    for column in VOLUME_COLUMNS:
+        if column in df.columns and not pd.api.types.is_integer_dtype(df[column]):
+            # 成交量单位为手，取整后按取值范围选择最小的整数类型
+            df[column] = pd.to_numeric(df[column].round().fillna(0).astype(np.int64), downcast='unsigned')
+    if 'trade_date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['trade_date']):
+        df['trade_date'] = pd.to_datetime(df['trade_date'], format='%Y%m%d')
+    return df
+
+
+def load_stock_frame(
+    ts_code: str,
+    start_date: str,
+    end_date: str,
+    client: TushareClient,
+    columns: Optional[List[str]] = None,
+    adj: Optional[str] = None,
+    cache: bool = True
+) -> Optional[pd.DataFrame]:
+    """获取单只股票的日线及技术指标（按日期降序，紧凑数据类型），无数据时返回 None
+
+    指定 columns 时只计算并返回这些列（总是包含 trade_date）；adj 为 qfq/hfq 时返回复权数据。
+    完整结果缓存在 stock:{代码}:{开始}:{结束}[:{复权方式}]，可以满足任意列组合的查询；
+    部分列的结果额外带上列名后缀缓存。cache 为 False 时不读写结果缓存（如全市场导出）。
+    """
+    # 优先读取跨进程共享的指标结果缓存
+    cache_key = f"stock:{ts_code}:{start_date}:{end_date}"
+    if adj is not None:
+        cache_key = f"{cache_key}:{adj}"
+    if columns is None:
+        cache_keys = [cache_key]
+    else:
+        columns = list(dict.fromkeys(["trade_date"] + list(columns)))
+        cache_keys = [cache_key, f"{cache_key}:{','.join(sorted(columns))}"]
+    cached = get_first_frame(cache_keys, columns) if cache else None
+    if cached is not None:
+        return compact_frame(cached)
+
+    # 获取日线数据及技术指标（指标基于本地完整历史预先计算，查询只做切片）
+    df = get_indicator_frame(
+        ts_code, start_date, end_date,
+        fetch=lambda s, e: fetch_bars(client, ts_code, s, e),
+        columns=columns,
+        adj=adj
+    )
+    if df.empty:
+        return None
+
+    # 涨跌幅保留2位小数
+    if 'pct_chg' in df.columns:
+        df['pct_chg'] = df['pct_chg'].round(2)
+
+    # 添加股票名称
+    if columns is None or 'stock_name' in columns:
+        df['stock_name'] = get_symbol_registry().name(ts_code)
+
+    df = compact_frame(df.sort_values('trade_date', ascending=False, ignore_index=True))
+    if cache:
+        set_frame(cache_keys[-1], df)
+    return df
+
+
+def load_stock_frames(
+    ts_codes: List[str],
+    start_date: str,
+    end_date: str,
+    client: TushareClient,
+    columns: Optional[List[str]] = None,
+    adj: Optional[str] = None
+) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """并发获取多只股票的数据
+
+    各股票在线程池中并行获取，总耗时取决于最慢的一只。
+    返回 (合并后的长表, {股票代码: 错误信息})，无数据的股票记为错误。
+    """
+    futures = {
+        ts_code: _executor.submit(load_stock_frame, ts_code, start_date, end_date, client, columns, adj)
+        for ts_code in dict.fromkeys(ts_codes)
+    }
+
+    frames = []
+    errors = {}
+    for ts_code, future in futures.items():
+        try:
+            df = future.result()
+        except Exception as e:
+            errors[ts_code] = str(e)
+            continue
+        if df is None:
+            errors[ts_code] = "未找到数据"
+        else:
+            frames.append(df)
+
+    if not frames:
+        return pd.DataFrame(), errors
+
+    # 统一各股票的分类取值，合并后仍保持分类类型
+    for column in CATEGORY_COLUMNS:
+        if column in frames[0].columns:
+            categories = pd.api.types.union_categoricals([frame[column] for frame in frames], sort_categories=True).categories
+            frames = [frame.assign(**{column: frame[column].cat.set_categories(categories)}) for frame in frames]
+    return pd.concat(frames, ignore_index=True), errors
+
+
+def iter_stock_frames(
+    ts_codes: List[str],
+    start_date: str,
+    end_date: str,
+    client: TushareClient,
+    columns: Optional[List[str]] = None,
+    adj: Optional[str] = None,
+    prefetch: int = EXPORT_PREFETCH
+) -> Iterator[Tuple[str, Optional[pd.DataFrame], Optional[str]]]:
+    """按顺序逐只产出 (股票代码, 数据, 错误信息)，不合并结果
+
+    最多 prefetch 只股票同时在线程池中获取，内存占用与股票总数无关；
+    结果不写入结果缓存，避免大批量导出挤占缓存。
+    """
+    pending = deque()
+    codes = iter(dict.fromkeys(ts_codes))
+    while True:
+        while len(pending) < prefetch:
+            ts_code = next(codes, None)
+            if ts_code is None:
+                break
+            pending.append((ts_code, _executor.submit(
+                load_stock_frame, ts_code, start_date, end_date, client, columns, adj, False
+            )))
+        if not pending:
+            return
+
+        ts_code, future = pending.popleft()
+        try:
+            df = future.result()
+        except Exception as e:
+            yield ts_code, None, str(e)
+            continue
+        yield ts_code, df, None if df is not None else "未找到数据"
+
+
+# 汇总计算依赖的列
+SUMMARY_COLUMNS = ['ts_code', 'stock_name', 'trade_date', 'close', 'high', 'low', 'vol_ratio']
+
+
+@timed("transform")
+def summarize_stock_frames(df: pd.DataFrame) -> pd.DataFrame:
+    """按股票汇总区间指标（df 需包含 SUMMARY_COLUMNS）"""
+    df = df.sort_values(['ts_code', 'trade_date'])
+    grouped = df.groupby('ts_code', sort=False, observed=True)
+    first_close = grouped['close'].first()
+    last_close = grouped['close'].last()
+    summary = pd.DataFrame({
+        'stock_name': grouped['stock_name'].first(),
+        'days': grouped.size(),
+        'start_close': first_close,
+        'last_close': last_close,
+        'period_return': ((last_close / first_close - 1) * 100).round(2),
+        'high': grouped['high'].max(),
+        'low': grouped['low'].min(),
+        'avg_vol_ratio': grouped['vol_ratio'].mean().round(2)
+    })
+    return summary.reset_index().sort_values('period_return', ascending=False)
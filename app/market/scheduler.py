@@ -0,0 +1,101 @@
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+import redis
+
+from app.config import PREWARM_TIME, PREWARM_WINDOW_DAYS
+from app.database.session import SessionLocal
+from app.market.query import load_stock_frames
+from app.market.tushare_client import TushareClient
+from app.redis.cache import MARKET_TZ, seconds_until_market_time
+from app.redis.client import get_redis
+from app.services.watchlist import get_watchlisted_codes
+
+logger = logging.getLogger(__name__)
+
+# 多副本部署时，每天只由一个进程执行预热
+PREWARM_LOCK_KEY = "prewarm:lock:{date}"
+PREWARM_LOCK_TTL = 6 * 3600
+
+_scheduler_thread: Optional[threading.Thread] = None
+_scheduler_lock = threading.Lock()
+
+
+def next_weekday(day: date) -> date:
+    """下一个工作日"""
+    day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day
+
+
+def prewarm_windows(now: Optional[datetime] = None) -> List[Tuple[str, str]]:
+    """需要预热的查询区间
+
+    与分析页面默认查询区间的计算方式一致（结束日期为当天），同时覆盖今天和
+    下一个工作日，用户第二天早上的查询可以直接命中缓存。
+    """
+    today = (now or datetime.now()).date()
+    windows = []
+    for end in (today, next_weekday(today)):
+        for days in PREWARM_WINDOW_DAYS:
+            start = end - timedelta(days=days)
+            windows.append((start.strftime("%Y%m%d"), end.strftime("%Y%m%d")))
+    return windows
+
+
+def prewarm_watchlists(client: TushareClient) -> int:
+    """预先获取并计算所有自选股的数据，写入共享缓存，返回股票数"""
+    db = SessionLocal()
+    try:
+        ts_codes = get_watchlisted_codes(db)
+    finally:
+        db.close()
+    if not ts_codes:
+        return 0
+
+    for start_date, end_date in prewarm_windows():
+        _, errors = load_stock_frames(ts_codes, start_date, end_date, client)
+        for ts_code, error in errors.items():
+            logger.warning("Prewarm failed for %s (%s-%s): %s", ts_code, start_date, end_date, error)
+    return len(ts_codes)
+
+
+def _acquire_daily_lock() -> bool:
+    key = PREWARM_LOCK_KEY.format(date=datetime.now(MARKET_TZ).strftime("%Y%m%d"))
+    try:
+        return bool(get_redis().set(key, os.getpid(), nx=True, ex=PREWARM_LOCK_TTL))
+    except redis.RedisError:
+        return True
+
+
+def _run_scheduler(client: TushareClient) -> None:
+    while True:
+        time.sleep(seconds_until_market_time(PREWARM_TIME))
+        if not _acquire_daily_lock():
+            continue
+        try:
+            started = time.perf_counter()
+            count = prewarm_watchlists(client)
+            logger.info("Prewarmed %d watchlisted symbols in %.1fs", count, time.perf_counter() - started)
+        except Exception:
+            logger.exception("Watchlist prewarm failed")
+
+
+def start_prewarm_scheduler(client: TushareClient) -> None:
+    """启动自选股预热后台线程（每个进程只启动一次）"""
+    global _scheduler_thread
+    with _scheduler_lock:
+        if _scheduler_thread is not None:
+            return
+        _scheduler_thread = threading.Thread(
+            target=_run_scheduler,
+            args=(client,),
+            name="prewarm-scheduler",
+            daemon=True
+        )
+        _scheduler_thread.start()
@@ -0,0 +1,106 @@
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from app.config import SNAPSHOT_PATH
+from app.market.indicators import INDICATOR_COLUMNS, get_indicator_store
+from app.market.store import get_bar_store, shift_date, write_table_atomic
+from app.market.symbols import get_symbol_registry
+
+# 快照中保留的日线字段
+SNAPSHOT_BAR_COLUMNS = ["trade_date", "open", "high", "low", "close", "pct_chg", "vol"]
+
+# 读取最近日线时向前取的自然日数
+SNAPSHOT_LOOKBACK_DAYS = 30
+
+_snapshot_cache = {"mtime": None, "frame": None}
+_snapshot_lock = threading.Lock()
+
+
+def build_snapshot(ts_codes: Optional[List[str]] = None) -> int:
+    """生成全市场最新交易日快照（每只股票一行：最新日线 + 指标 + 行业信息）"""
+    bar_store = get_bar_store()
+    indicator_store = get_indicator_store()
+    registry = get_symbol_registry()
+    ts_codes = ts_codes if ts_codes is not None else bar_store.symbols()
+
+    rows = []
+    for ts_code in ts_codes:
+        coverage = bar_store.coverage(ts_code)
+        if not coverage:
+            continue
+        start_date = shift_date(coverage[1], -SNAPSHOT_LOOKBACK_DAYS)
+        bars = bar_store.read(ts_code, start_date=start_date, columns=SNAPSHOT_BAR_COLUMNS)
+        if bars.empty:
+            continue
+        latest = bars.iloc[[-1]]
+        indicators = indicator_store.read(ts_code, start_date=latest["trade_date"].iat[0], columns=INDICATOR_COLUMNS)
+        row = latest.merge(indicators, on="trade_date", how="left")
+        info = registry.get(ts_code)
+        row.insert(0, "ts_code", ts_code)
+        row["name"] = info.name if info else ""
+        row["industry"] = info.industry if info else ""
+        row["area"] = info.area if info else ""
+        rows.append(row)
+    if not rows:
+        return 0
+
+    snapshot = pd.concat(rows, ignore_index=True)
+    path = Path(SNAPSHOT_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_table_atomic(pa.Table.from_pandas(snapshot, preserve_index=False), path)
+    return len(snapshot)
+
+
+def load_snapshot() -> Optional[pd.DataFrame]:
+    """读取全市场快照（进程内缓存，文件更新后自动重新加载）"""
+    path = Path(SNAPSHOT_PATH)
+    if not path.exists():
+        return None
+    mtime = path.stat().st_mtime
+    with _snapshot_lock:
+        if _snapshot_cache["mtime"] != mtime:
+            _snapshot_cache["frame"] = pd.read_parquet(path)
+            _snapshot_cache["mtime"] = mtime
+        return _snapshot_cache["frame"]
+
+
+def screen(
+    snapshot: pd.DataFrame,
+    above_ma: Optional[str] = None,
+    vol_ratio_min: Optional[float] = None,
+    vol_ratio_max: Optional[float] = None,
+    pct_chg_min: Optional[float] = None,
+    pct_chg_max: Optional[float] = None,
+    industries: Optional[List[str]] = None,
+    latest_only: bool = True,
+    sort_by: str = "vol_ratio",
+    ascending: bool = False,
+    limit: Optional[int] = 100
+) -> pd.DataFrame:
+    """按条件筛选快照并排序
+
+    above_ma 为均线列名（如 "ma20"），表示收盘价在该均线之上；
+    latest_only 为 True 时排除最新交易日停牌的股票。
+    """
+    mask = pd.Series(True, index=snapshot.index)
+    if latest_only:
+        mask &= snapshot["trade_date"] == snapshot["trade_date"].max()
+    if above_ma:
+        mask &= snapshot["close"] > snapshot[above_ma]
+    if vol_ratio_min is not None:
+        mask &= snapshot["vol_ratio"] >= vol_ratio_min
+    if vol_ratio_max is not None:
+        mask &= snapshot["vol_ratio"] <= vol_ratio_max
+    if pct_chg_min is not None:
+        mask &= snapshot["pct_chg"] >= pct_chg_min
+    if pct_chg_max is not None:
+        mask &= snapshot["pct_chg"] <= pct_chg_max
+    if industries:
+        mask &= snapshot["industry"].isin(industries)
+
+    result = snapshot[mask].sort_values(sort_by, ascending=ascending, na_position="last")
+    return result.head(limit) if limit else result
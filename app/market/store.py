@@ -0,0 +1,210 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from app.config import BAR_STORE_DIR
+
+# 日期格式（与 Tushare 保持一致）
+DATE_FORMAT = "%Y%m%d"
+
+# 已拉取区间记录在 Parquet 文件元数据中，与数据一起原子写入
+COVERED_START_KEY = b"covered_start"
+COVERED_END_KEY = b"covered_end"
+
+
+def shift_date(date_str: str, days: int) -> str:
+    """日期字符串加减天数"""
+    return (datetime.strptime(date_str, DATE_FORMAT) + timedelta(days=days)).strftime(DATE_FORMAT)
+
+
+def settled_end_date(end_date: str, df: Optional[pd.DataFrame]) -> str:
+    """计算一次拉取后可以视为已完整覆盖的截止日期
+
+    当天收盘数据可能尚未发布，若返回结果里没有当天的数据，则只记录到前一天，
+    下次查询时会重新拉取当天。
+    """
+    today = datetime.now().strftime(DATE_FORMAT)
+    if end_date < today:
+        return end_date
+    if df is not None and not df.empty and (df["trade_date"] == today).any():
+        return today
+    return shift_date(today, -1)
+
+
+def write_table_atomic(table: pa.Table, path: Path) -> None:
+    """先写临时文件再替换，读者不会看到写了一半的文件"""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class BarStore:
+    """按股票代码分区的本地日线存储
+
+    每只股票对应一个 Parquet 文件，文件元数据记录已经从 Tushare 拉取过的日期区间，
+    查询时直接从磁盘读取切片，只补拉缺失的区间。
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, ts_code: str) -> Path:
+        return self.root / f"{ts_code}.parquet"
+
+    def _lock(self, ts_code: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(ts_code, threading.Lock())
+
+    def symbols(self) -> List[str]:
+        """获取已存储的股票代码列表"""
+        return sorted(p.stem for p in self.root.glob("*.parquet"))
+
+    def coverage(self, ts_code: str) -> Optional[Tuple[str, str]]:
+        """获取已拉取的日期区间 (start_date, end_date)"""
+        path = self._path(ts_code)
+        if not path.exists():
+            return None
+        metadata = pq.read_schema(path).metadata or {}
+        if COVERED_START_KEY not in metadata or COVERED_END_KEY not in metadata:
+            return None
+        return metadata[COVERED_START_KEY].decode(), metadata[COVERED_END_KEY].decode()
+
+    def signature(self, ts_code: str) -> Optional[str]:
+        """数据文件的版本标识（修改时间、大小和 inode，每次写入都会变化），文件不存在时为 None
+
+        只读取文件状态，不打开文件；写入是替换整个文件，内容不变时标识同样会变化。
+        """
+        try:
+            stat = self._path(ts_code).stat()
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_mtime_ns}:{stat.st_size}:{stat.st_ino}"
+
+    def num_rows(self, ts_code: str) -> int:
+        """获取已存储的日线条数（只读取文件元数据）"""
+        path = self._path(ts_code)
+        return pq.read_metadata(path).num_rows if path.exists() else 0
+
+    def read(
+        self,
+        ts_code: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """读取指定日期区间的日线数据（按日期升序），columns 中不存在的列会被忽略"""
+        path = self._path(ts_code)
+        if not path.exists():
+            return pd.DataFrame()
+        parquet_file = pq.ParquetFile(path)
+        try:
+            names = parquet_file.schema_arrow.names
+            if "trade_date" not in names:
+                return pd.DataFrame()
+            if columns is not None:
+                # 只读取文件中存在的列，按日期筛选时额外读取 trade_date
+                columns = [column for column in columns if column in names]
+            read_columns = columns
+            if columns is not None and "trade_date" not in columns and (start_date or end_date):
+                read_columns = columns + ["trade_date"]
+            table = parquet_file.read(columns=read_columns)
+        finally:
+            parquet_file.close()
+
+        # 单文件直接用向量化比较筛选日期，比 read_table 的 filters 开销小
+        if start_date:
+            table = table.filter(pc.greater_equal(table.column("trade_date"), start_date))
+        if end_date:
+            table = table.filter(pc.less_equal(table.column("trade_date"), end_date))
+        if read_columns is not columns:
+            table = table.drop_columns(["trade_date"])
+        return table.to_pandas()
+
+    def write(self, ts_code: str, df: pd.DataFrame, covered_start: str, covered_end: str) -> None:
+        """合并写入新数据，并把覆盖区间扩展到 [covered_start, covered_end]
+
+        新区间必须与已有区间相交或相邻，保证覆盖区间始终连续。
+        """
+        with self._lock(ts_code):
+            coverage = self.coverage(ts_code)
+            if coverage:
+                start, end = coverage
+                if covered_start > shift_date(end, 1) or covered_end < shift_date(start, -1):
+                    raise ValueError(f"{ts_code} 的写入区间与已有区间不连续")
+                covered_start = min(start, covered_start)
+                covered_end = max(end, covered_end)
+
+            frames = [f for f in (self.read(ts_code), df) if f is not None and not f.empty]
+            if frames:
+                merged = pd.concat(frames, ignore_index=True)
+                merged = merged.drop_duplicates(subset="trade_date", keep="last")
+                merged = merged.sort_values("trade_date").reset_index(drop=True)
+                table = pa.Table.from_pandas(merged, preserve_index=False)
+            else:
+                table = pa.table({})
+
+            table = table.replace_schema_metadata({
+                COVERED_START_KEY: covered_start.encode(),
+                COVERED_END_KEY: covered_end.encode()
+            })
+
+            write_table_atomic(table, self._path(ts_code))
+
+    def ensure_column(self, ts_code: str, column: str, fetch: Callable[[str, str], pd.DataFrame]) -> None:
+        """旧版本写入的数据没有 column 列时，通过 fetch 重新拉取整个覆盖区间补齐（只发生一次）
+
+        列中的个别空值不会触发重新拉取，由使用方补齐（如复权因子沿用相邻交易日）。
+        """
+        coverage = self.coverage(ts_code)
+        if not coverage or self.num_rows(ts_code) == 0:
+            return
+        if column in pq.read_schema(self._path(ts_code)).names:
+            return
+        start, end = coverage
+        self.write(ts_code, fetch(start, end), start, end)
+
+    def missing_ranges(self, ts_code: str, start_date: str, end_date: str) -> List[Tuple[str, str]]:
+        """计算查询区间中尚未拉取的部分"""
+        coverage = self.coverage(ts_code)
+        if not coverage:
+            return [(start_date, end_date)]
+
+        start, end = coverage
+        ranges = []
+        if start_date < start:
+            ranges.append((start_date, shift_date(start, -1)))
+        if end_date > end:
+            ranges.append((shift_date(end, 1), end_date))
+        return ranges
+
+    def ensure(
+        self,
+        ts_code: str,
+        start_date: str,
+        end_date: str,
+        fetch: Callable[[str, str], pd.DataFrame]
+    ) -> None:
+        """补拉本地缺失的区间，保证 [start_date, end_date] 已覆盖"""
+        for range_start, range_end in self.missing_ranges(ts_code, start_date, end_date):
+            df = fetch(range_start, range_end)
+            covered_end = settled_end_date(range_end, df)
+            if covered_end >= range_start:
+                self.write(ts_code, df, range_start, covered_end)
+
+
+# 创建本地行情存储
+bar_store = BarStore(BAR_STORE_DIR)
+
+def get_bar_store() -> BarStore:
+    """获取本地行情存储"""
+    return bar_store
@@ -0,0 +1,116 @@
+import bisect
+import threading
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional
+
+import pandas as pd
+from pypinyin import Style, lazy_pinyin
+
+from app.config import STOCK_LIST_PATH
+
+
+class StockInfo(NamedTuple):
+    """股票基本信息"""
+    ts_code: str
+    symbol: str
+    name: str
+    area: str
+    industry: str
+    list_date: str
+
+
+def name_initials(name: str) -> str:
+    """股票名称的拼音首字母（如 平安银行 -> payh）"""
+    return "".join(lazy_pinyin(name, style=Style.FIRST_LETTER)).lower()
+
+
+class SymbolRegistry:
+    """进程内的股票代码注册表
+
+    对 ts_code 和 symbol 建立哈希索引，代码解析为 O(1)；
+    对代码、名称和拼音首字母建立有序索引，用于前缀搜索（自动补全）。
+    """
+
+    def __init__(self, stocks: pd.DataFrame):
+        stocks = stocks.fillna("")
+        self._by_ts_code: Dict[str, StockInfo] = {}
+        self._by_symbol: Dict[str, StockInfo] = {}
+        self._by_industry: Dict[str, List[StockInfo]] = defaultdict(list)
+        self._by_area: Dict[str, List[StockInfo]] = defaultdict(list)
+
+        search_keys = []
+        for row in stocks.itertuples(index=False):
+            info = StockInfo(row.ts_code, row.symbol, row.name, row.area, row.industry, row.list_date)
+            self._by_ts_code[info.ts_code] = info
+            self._by_symbol[info.symbol] = info
+            self._by_industry[info.industry].append(info)
+            self._by_area[info.area].append(info)
+            for key in {info.ts_code.lower(), info.name.lower(), name_initials(info.name)}:
+                search_keys.append((key, info.ts_code))
+
+        search_keys.sort()
+        self._search_keys = [key for key, _ in search_keys]
+        self._search_codes = [ts_code for _, ts_code in search_keys]
+
+    def __len__(self) -> int:
+        return len(self._by_ts_code)
+
+    def get(self, ts_code: str) -> Optional[StockInfo]:
+        """通过 ts_code 获取股票信息"""
+        return self._by_ts_code.get(ts_code)
+
+    def resolve(self, code: str) -> Optional[str]:
+        """把用户输入的代码（000001.SZ / 000001）解析为 ts_code"""
+        code = code.strip().upper()
+        if code in self._by_ts_code:
+            return code
+        info = self._by_symbol.get(code)
+        return info.ts_code if info else None
+
+    def name(self, ts_code: str) -> str:
+        """获取股票名称，未知代码返回空字符串"""
+        info = self._by_ts_code.get(ts_code)
+        return info.name if info else ""
+
+    def search(self, query: str, limit: int = 20) -> List[StockInfo]:
+        """按代码、名称或拼音首字母前缀搜索"""
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        results: Dict[str, StockInfo] = {}
+        i = bisect.bisect_left(self._search_keys, query)
+        while i < len(self._search_keys) and self._search_keys[i].startswith(query) and len(results) < limit:
+            ts_code = self._search_codes[i]
+            results.setdefault(ts_code, self._by_ts_code[ts_code])
+            i += 1
+        return list(results.values())
+
+    def by_industry(self, industry: str) -> List[StockInfo]:
+        """获取某个行业的全部股票"""
+        return list(self._by_industry.get(industry, []))
+
+    def by_area(self, area: str) -> List[StockInfo]:
+        """获取某个地区的全部股票"""
+        return list(self._by_area.get(area, []))
+
+    def industries(self) -> List[str]:
+        """全部行业"""
+        return sorted(k for k in self._by_industry if k)
+
+    def areas(self) -> List[str]:
+        """全部地区"""
+        return sorted(k for k in self._by_area if k)
+
+
+_registry: Optional[SymbolRegistry] = None
+_registry_lock = threading.Lock()
+
+def get_symbol_registry() -> SymbolRegistry:
+    """获取股票代码注册表（每个进程只解析一次股票列表）"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            stocks = pd.read_csv(STOCK_LIST_PATH, dtype=str)
+            _registry = SymbolRegistry(stocks)
+        return _registry
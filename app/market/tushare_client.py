@@ -0,0 +1,125 @@
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+import tushare as ts
+
+from app.config import (
+    TUSHARE_TOKEN,
+    TUSHARE_RATE_LIMIT,
+    TUSHARE_MAX_WORKERS,
+    TUSHARE_MAX_RETRIES,
+    TUSHARE_RETRY_BACKOFF
+)
+from app.metrics import get_metrics, timer
+
+
+class TokenBucket:
+    """令牌桶限流器（按每分钟配额匀速补充令牌）"""
+
+    def __init__(self, rate_per_minute: int, capacity: Optional[int] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1, rate_per_minute // 60)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """获取一个令牌，令牌不足时阻塞等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class TushareClient:
+    """共享的 Tushare 请求客户端
+
+    所有请求在线程池中执行并经过令牌桶限流，失败时指数退避重试；
+    参数完全相同且仍在进行中的请求会合并为一次上游调用。
+    pro 为实现了 query(api_name, **params) 的数据源，默认为 tushare pro 接口（基准测试中替换为本地模拟数据）。
+    """
+
+    def __init__(
+        self,
+        token: str,
+        rate_per_minute: int = TUSHARE_RATE_LIMIT,
+        max_workers: int = TUSHARE_MAX_WORKERS,
+        max_retries: int = TUSHARE_MAX_RETRIES,
+        retry_backoff: float = TUSHARE_RETRY_BACKOFF,
+        pro=None
+    ):
+        self._pro = pro if pro is not None else ts.pro_api(token)
+        self._bucket = TokenBucket(rate_per_minute)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tushare")
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+        self._inflight: Dict[Tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    def submit(self, api_name: str, **params) -> Future:
+        """提交请求，返回 Future；相同的进行中请求共享同一个 Future"""
+        key = (api_name, tuple(sorted(params.items())))
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._call, api_name, params)
+            self._inflight[key] = future
+
+        def _release(done: Future) -> None:
+            with self._inflight_lock:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+        future.add_done_callback(_release)
+        return future
+
+    def query(self, api_name: str, **params) -> pd.DataFrame:
+        """同步请求（结果可能被合并请求共享，返回副本）"""
+        return self.submit(api_name, **params).result().copy()
+
+    def daily(self, **params) -> pd.DataFrame:
+        """日线行情"""
+        return self.query("daily", **params)
+
+    def adj_factor(self, **params) -> pd.DataFrame:
+        """复权因子"""
+        return self.query("adj_factor", **params)
+
+    def trade_cal(self, **params) -> pd.DataFrame:
+        """交易日历"""
+        return self.query("trade_cal", **params)
+
+    def _call(self, api_name: str, params: dict) -> pd.DataFrame:
+        for attempt in range(self._max_retries + 1):
+            self._bucket.acquire()
+            try:
+                with timer("fetch", api_name):
+                    return self._pro.query(api_name, **params)
+            except Exception:
+                get_metrics().inc("tushare_errors_total", api=api_name)
+                if attempt == self._max_retries:
+                    raise
+                time.sleep(self._retry_backoff * (2 ** attempt) * (1 + random.random()))
+
+
+_client: Optional[TushareClient] = None
+_client_lock = threading.Lock()
+
+def get_tushare_client(token: Optional[str] = None) -> TushareClient:
+    """获取进程内共享的 Tushare 客户端（首次调用时创建）"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = TushareClient(token or TUSHARE_TOKEN)
+        return _client
@@ -0,0 +1,257 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config import METRICS_ENABLED, METRICS_HOST
+
+logger = logging.getLogger(__name__)
+
+# 指标名前缀
+NAMESPACE = "smart_inv"
+
+# 耗时直方图的桶上限（秒）
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 各阶段的说明（fetch 接口请求、compute 指标计算、transform 类型转换/排序/投影、render 表格和图表序列化、
+# db 数据库查询、redis 缓存读写、auth 认证、page 整次脚本运行）
+STAGES = ["fetch", "compute", "transform", "render", "db", "redis", "auth", "page"]
+
+
+class Histogram:
+    """固定桶的耗时直方图（与 Prometheus histogram 的语义一致）"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个桶为 +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按桶内线性插值估计分位数（同 histogram_quantile），不超过实际的最大值"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if cumulative + count >= rank and count > 0:
+                if i == len(self.buckets):
+                    return self.max
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                return min(lower + (self.buckets[i] - lower) * (rank - cumulative) / count, self.max)
+            cumulative += count
+        return self.max
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+class MetricsRegistry:
+    """进程内的耗时和计数统计
+
+    耗时按 (阶段, 名称) 记录为直方图，计数器带任意标签；
+    collector 在导出时调用，返回当时的数值（如哈希进程池的队列深度），作为 gauge 导出。
+    """
+
+    def __init__(self, enabled: bool = True, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self.started = time.time()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._collectors: Dict[str, Callable[[], dict]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, name: str, seconds: float) -> None:
+        """记录一次耗时"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get((stage, name))
+            if histogram is None:
+                histogram = self._histograms[(stage, name)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str, name: str) -> Iterator[None]:
+        """统计代码块的耗时（抛出异常时同样记录）"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, name, time.perf_counter() - started)
+
+    def inc(self, counter: str, value: float = 1.0, **labels) -> None:
+        """计数器加 value"""
+        if not self.enabled:
+            return
+        key = (counter, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def register_collector(self, name: str, collect: Callable[[], dict]) -> None:
+        """注册导出时调用的 gauge 来源，collect() 返回 {指标: 数值}"""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def histograms(self) -> List[dict]:
+        """各 (阶段, 名称) 的耗时汇总（秒），按总耗时降序"""
+        with self._lock:
+            items = [
+                (stage, name, histogram.count, histogram.sum, list(histogram.counts),
+                 [histogram.quantile(q) for q in (0.5, 0.95, 0.99)])
+                for (stage, name), histogram in self._histograms.items()
+            ]
+        rows = [
+            {
+                "stage": stage,
+                "name": name,
+                "count": count,
+                "sum": total,
+                "mean": total / count if count else 0.0,
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+                "buckets": counts
+            }
+            for stage, name, count, total, counts, (p50, p95, p99) in items
+        ]
+        return sorted(rows, key=lambda row: row["sum"], reverse=True)
+
+    def counter(self, counter: str, **labels) -> float:
+        """读取计数器的当前值"""
+        with self._lock:
+            return self._counters.get((counter, tuple(sorted(labels.items()))), 0.0)
+
+    def collect(self) -> Dict[str, dict]:
+        """调用所有 collector，出错的 collector 跳过"""
+        with self._lock:
+            collectors = dict(self._collectors)
+        values = {}
+        for name, collect in collectors.items():
+            try:
+                values[name] = collect()
+            except Exception:
+                logger.exception("Metrics collector %s failed", name)
+        return values
+
+    def render(self) -> str:
+        """导出 Prometheus 文本格式"""
+        lines = []
+        metric = f"{NAMESPACE}_stage_seconds"
+        lines.append(f"# HELP {metric} Time spent per stage (fetch/compute/transform/render/db/redis/auth/page).")
+        lines.append(f"# TYPE {metric} histogram")
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            for (stage, name), histogram in histograms:
+                labels = {"stage": stage, "name": name}
+                cumulative = 0
+                for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_format_labels({**labels, 'le': bound})} {cumulative}")
+                lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum}")
+                lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+
+        declared = set()
+        for (counter, labels), value in counters:
+            metric = f"{NAMESPACE}_{counter}"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{_format_labels(dict(labels))} {value}")
+
+        for collector, values in sorted(self.collect().items()):
+            for key, value in sorted(values.items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                metric = f"{NAMESPACE}_{collector}_{key}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+
+        metric = f"{NAMESPACE}_process_start_time_seconds"
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {self.started}")
+        return "\n".join(lines) + "\n"
+
+
+# 创建进程内的指标统计
+metrics = MetricsRegistry(enabled=METRICS_ENABLED)
+
+def get_metrics() -> MetricsRegistry:
+    """获取进程内的指标统计"""
+    return metrics
+
+def timer(stage: str, name: str):
+    """统计代码块的耗时，如 with timer("fetch", "daily"): ..."""
+    return metrics.timer(stage, name)
+
+def timed(stage: str, name: Optional[str] = None):
+    """统计函数耗时的装饰器，name 默认为函数名"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with metrics.timer(stage, name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 抓取请求很频繁，不写访问日志
+        pass
+
+
+_server_started = False
+_server_lock = threading.Lock()
+
+def start_metrics_server(port: int, host: str = METRICS_HOST) -> None:
+    """在后台线程中提供 /metrics（每个进程只尝试启动一次，port 为 0 时不启动）
+
+    /metrics 没有认证，默认只监听本机地址；Prometheus 在其他机器上时通过 METRICS_HOST 指定监听地址。
+    端口被占用时（如同一台机器上的其他进程已经启动）只记录警告，不影响应用。
+    """
+    global _server_started
+    if port <= 0 or not METRICS_ENABLED:
+        return
+    with _server_lock:
+        if _server_started:
+            return
+        _server_started = True
+        try:
+            server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            logger.warning("Metrics server not started on port %d: %s", port, e)
+            return
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
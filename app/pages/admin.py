@@ -1,53 +1,173 @@
+import math
+from datetime import datetime
+import altair as alt
+import pandas as pd
 import streamlit as st
-from app.database.session import SessionLocal
-from app.services.user import get_pending_approvals, approve_user, is_admin
+from app.config import METRICS_PORT
+from app.database.session import get_session
+from app.metrics import STAGES, get_metrics
+from app.services.user import get_pending_approvals, bulk_approve_users, is_admin
+
+# 每页可选的记录数
+PAGE_SIZES = [20, 50, 100, 200]
 
 def admin_page():
     st.title("管理员控制台")
-    
+
     # 检查是否登录和是否是管理员
     if "user" not in st.session_state:
         st.error("请先登录")
         st.markdown("[去登录](/)")
         return
-        
+
     if not st.session_state.user.get("is_admin"):
         st.error("无权访问此页面")
         return
 
-    # 获取待审批用户列表
-    db = SessionLocal()
+    approvals_tab, metrics_tab = st.tabs(["用户审批", "运行指标"])
+    with approvals_tab:
+        approvals_panel()
+    with metrics_tab:
+        metrics_panel()
+
+def approvals_panel():
+    """待审批用户列表及批量审批"""
+    db = get_session()
     try:
-        pending_approvals = get_pending_approvals(db)
-        
-        if not pending_approvals:
+        col1, col2 = st.columns([1, 1])
+        with col1:
+            page_size = st.selectbox("每页显示", PAGE_SIZES, index=1)
+        with col2:
+            page = st.number_input("页码", min_value=1, value=1, step=1)
+
+        pending_approvals, total = get_pending_approvals(db, page=page, page_size=page_size)
+
+        if total == 0:
             st.info("没有待审批的用户")
             return
-            
+
+        page_count = math.ceil(total / page_size)
+        if not pending_approvals:
+            st.warning(f"页码超出范围，共 {page_count} 页")
+            return
+
         st.subheader("待审批用户列表")
-        
-        for approval in pending_approvals:
-            user = approval.user
-            col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
-            
-            with col1:
-                st.write(f"用户名: {user.username}")
-            with col2:
-                st.write(f"邮箱: {user.email}")
-            with col3:
-                if st.button("通过", key=f"approve_{approval.id}"):
-                    approve_user(db, approval.id, st.session_state.user["id"], True)
-                    st.success("已通过")
-                    st.rerun()
-            with col4:
-                if st.button("拒绝", key=f"reject_{approval.id}"):
-                    approve_user(db, approval.id, st.session_state.user["id"], False)
-                    st.success("已拒绝")
-                    st.rerun()
-            
-            st.markdown("---")
+        st.caption(f"共 {total} 个待审批用户，第 {page}/{page_count} 页")
+
+        table = pd.DataFrame({
+            "选择": False,
+            "用户名": [approval.user.username for approval in pending_approvals],
+            "邮箱": [approval.user.email for approval in pending_approvals],
+            "注册时间": [approval.created_at for approval in pending_approvals]
+        }, index=[approval.id for approval in pending_approvals])
+
+        select_all = st.checkbox("全选本页")
+        if select_all:
+            table["选择"] = True
+
+        edited = st.data_editor(
+            table,
+            hide_index=True,
+            use_container_width=True,
+            disabled=["用户名", "邮箱", "注册时间"],
+            key=f"approvals_{page}_{page_size}_{select_all}"
+        )
+        selected_ids = edited.index[edited["选择"]].tolist()
+
+        col1, col2, _ = st.columns([1, 1, 4])
+        with col1:
+            if st.button("通过所选", disabled=not selected_ids):
+                count = bulk_approve_users(db, selected_ids, st.session_state.user["id"], True)
+                st.success(f"已通过 {count} 个用户")
+                st.rerun()
+        with col2:
+            if st.button("拒绝所选", disabled=not selected_ids):
+                count = bulk_approve_users(db, selected_ids, st.session_state.user["id"], False)
+                st.success(f"已拒绝 {count} 个用户")
+                st.rerun()
     finally:
         db.close()
 
+def _ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+def _rate(hits: float, misses: float) -> str:
+    total = hits + misses
+    return f"{hits / total:.1%}" if total else "-"
+
+def metrics_panel():
+    """各阶段耗时、缓存命中率和密码哈希队列（当前进程自启动以来的统计）"""
+    metrics = get_metrics()
+    if not metrics.enabled:
+        st.info("运行指标未启用（METRICS_ENABLED=false）")
+        return
+
+    st.caption(
+        f"当前进程自 {datetime.fromtimestamp(metrics.started):%Y-%m-%d %H:%M:%S} 起的统计"
+        + (f"，Prometheus 抓取地址：http://<主机>:{METRICS_PORT}/metrics" if METRICS_PORT > 0 else "")
+    )
+    if st.button("刷新"):
+        st.rerun()
+
+    # 缓存命中率
+    collected = metrics.collect()
+    frame_cache = collected.get("frame_cache", {})
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(
+            "结果缓存命中率（全部进程）",
+            _rate(frame_cache.get("hits", 0), frame_cache.get("misses", 0)),
+            help=f"命中 {frame_cache.get('hits', 0)} 次，未命中 {frame_cache.get('misses', 0)} 次"
+        )
+    with col2:
+        hits = metrics.counter("cache_requests_total", cache="session", result="hit")
+        misses = metrics.counter("cache_requests_total", cache="session", result="miss")
+        st.metric("会话缓存命中率（本进程）", _rate(hits, misses), help=f"命中 {hits:.0f} 次，未命中 {misses:.0f} 次")
+
+    # 密码哈希进程池
+    hasher = collected.get("password_hasher", {})
+    if hasher:
+        st.subheader("密码哈希")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("排队/执行中", f"{hasher['queue_depth']} / {hasher['max_pending']}")
+        col2.metric("已完成", hasher["completed"])
+        col3.metric("已拒绝", hasher["rejected"])
+        col4.metric("平均耗时", f"{hasher['avg_ms']:.0f} ms")
+
+    # 各阶段耗时
+    rows = metrics.histograms()
+    if not rows:
+        st.info("暂无耗时数据")
+        return
+    st.subheader("各阶段耗时")
+    stages = st.multiselect("阶段", STAGES, placeholder="全部")
+    if stages:
+        rows = [row for row in rows if row["stage"] in stages]
+    table = pd.DataFrame({
+        "阶段": [row["stage"] for row in rows],
+        "名称": [row["name"] for row in rows],
+        "次数": [row["count"] for row in rows],
+        "平均(ms)": [_ms(row["mean"]) for row in rows],
+        "P50(ms)": [_ms(row["p50"]) for row in rows],
+        "P95(ms)": [_ms(row["p95"]) for row in rows],
+        "P99(ms)": [_ms(row["p99"]) for row in rows],
+        "总耗时(s)": [round(row["sum"], 2) for row in rows]
+    })
+    st.dataframe(table, use_container_width=True, hide_index=True)
+
+    # 单项的耗时分布
+    if rows:
+        labels = [f"{row['stage']} / {row['name']}" for row in rows]
+        choice = st.selectbox("耗时分布", range(len(rows)), format_func=labels.__getitem__)
+        buckets = [f"≤{_ms(bound):g}ms" for bound in metrics.buckets] + [f">{_ms(metrics.buckets[-1]):g}ms"]
+        distribution = pd.DataFrame({"耗时": buckets, "次数": rows[choice]["buckets"]})
+        # 横轴按桶的顺序排列（默认会按标签文字排序）
+        chart = alt.Chart(distribution).mark_bar().encode(
+            x=alt.X("耗时:N", sort=buckets, title=None),
+            y=alt.Y("次数:Q"),
+            tooltip=["耗时", "次数"]
+        )
+        st.altair_chart(chart, use_container_width=True)
+
 if __name__ == "__main__":
-    admin_page() 
\ No newline at end of file
+    admin_page()
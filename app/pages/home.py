@@ -1,6 +1,7 @@
 import streamlit as st
 from app.auth.middleware import require_auth
 from app.pages.stock_analysis import stock_analysis_page
+from app.pages.screener import screener_page
 from app.pages.login import logout
 
 @require_auth
@@ -20,15 +21,15 @@ def home_page():
     # 功能导航
     menu = st.sidebar.selectbox(
         "功能选择",
-        ["股票数据分析", "其他功能1", "其他功能2"],
+        ["股票数据分析", "条件选股", "其他功能2"],
         index=0
     )
     
     # 根据选择显示不同的功能页面
     if menu == "股票数据分析":
         stock_analysis_page()
-    elif menu == "其他功能1":
-        st.write("功能开发中...")
+    elif menu == "条件选股":
+        screener_page()
     elif menu == "其他功能2":
         st.write("功能开发中...")
     
@@ -1,8 +1,10 @@
 import streamlit as st
 from datetime import datetime, timedelta
-from app.database.session import SessionLocal
+from app.database.session import get_session
 from app.services.user import authenticate_user
 from app.auth.manager import create_access_token
+from app.auth.hashing import HashingBusyError
+from app.auth.session_cache import invalidate_token
 from app.redis.client import get_redis
 
 def logout():
@@ -10,6 +12,7 @@ def logout():
     redis_client = get_redis()
     if "token" in st.session_state:
         redis_client.delete(f"token:{st.session_state.token}")
+        invalidate_token(st.session_state.token)
     # 清除会话状态
     for key in ["user", "token"]:
         if key in st.session_state:
@@ -40,9 +43,13 @@ def login_page():
                 return
 
             # 验证用户
-            db = SessionLocal()
+            db = get_session()
             try:
-                user = authenticate_user(db, username, password)
+                try:
+                    user = authenticate_user(db, username, password)
+                except HashingBusyError:
+                    st.error("登录人数较多，请稍后重试")
+                    return
                 if user is None:
                     st.error("用户名或密码错误")
                     return
@@ -50,14 +57,20 @@ def login_page():
                     st.error("账号未激活，请等待管理员审批")
                     return
 
-                # 创建访问令牌
-                token = create_access_token({"sub": user.username})
+                # 根据"记住我"选项设置过期时间
+                expire_seconds = 7 * 24 * 3600 if remember_me else 24 * 3600
+
+                # 创建访问令牌（JWT 有效期与 Redis 中的会话一致）
+                token = create_access_token(
+                    {"sub": user.username},
+                    expires_delta=timedelta(seconds=expire_seconds)
+                )
                 
                 # 存储令牌到 Redis
                 redis_client = get_redis()
                 redis_client.setex(
                     f"token:{token}",
-                    7 * 24 * 3600 if remember_me else 24 * 3600,  # 根据"记住我"选项设置过期时间
+                    expire_seconds,
                     user.username
                 )
 
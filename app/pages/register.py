@@ -1,5 +1,5 @@
 import streamlit as st
-from app.database.session import SessionLocal
+from app.database.session import get_session
 from app.services.user import create_user, create_user_approval, get_user_by_username, get_user_by_email
 
 def register_page():
@@ -39,7 +39,7 @@ def register_page():
                 return
 
             # 创建用户
-            db = SessionLocal()
+            db = get_session()
             try:
                 # 检查用户名是否已存在
                 if get_user_by_username(db, username):
@@ -0,0 +1,101 @@
+import time
+import streamlit as st
+from app.auth.middleware import require_auth
+from app.market.indicators import MA_WINDOWS
+from app.market.screener import load_snapshot, screen
+from app.metrics import get_metrics, timer
+
+# 选股结果列名映射
+SCREENER_COLUMNS = {
+    'ts_code': '股票代码',
+    'name': '股票名称',
+    'industry': '行业',
+    'area': '地区',
+    'trade_date': '日期',
+    'close': '收盘价',
+    'pct_chg': '涨跌幅%',
+    'vol_ratio': '量比',
+    'ma5': 'M5',
+    'ma10': 'M10',
+    'ma20': 'M20',
+    'ma50': 'M50',
+    'ma120': 'M120',
+    'vol': '成交量'
+}
+
+# 可排序字段
+SORT_OPTIONS = {
+    '量比': 'vol_ratio',
+    '涨跌幅%': 'pct_chg',
+    '成交量': 'vol',
+    '收盘价': 'close'
+}
+
+# 涨跌幅滑块的范围（滑块在端点时不限）
+PCT_CHG_LIMIT = 20.0
+
+@require_auth
+def screener_page():
+    """条件选股页面"""
+    snapshot = load_snapshot()
+    if snapshot is None:
+        st.warning("尚未生成全市场快照，请先运行 scripts/ingest_daily.py")
+        return
+
+    st.caption(f"数据日期：{snapshot['trade_date'].max()}，共 {len(snapshot)} 只股票")
+
+    # 创建侧边栏输入
+    with st.sidebar:
+        st.header("选股条件")
+
+        ma_options = ["不限"] + [f"M{window}" for window in MA_WINDOWS]
+        above_ma = st.selectbox("收盘价站上均线", ma_options, index=ma_options.index("M20"))
+
+        col1, col2 = st.columns(2)
+        with col1:
+            vol_ratio_min = st.number_input("量比下限", value=2.0, step=0.5)
+        with col2:
+            vol_ratio_max = st.number_input("量比上限", value=0.0, step=0.5, help="0 表示不限")
+
+        pct_chg_min, pct_chg_max = st.slider(
+            "涨跌幅%区间",
+            -PCT_CHG_LIMIT,
+            PCT_CHG_LIMIT,
+            (-PCT_CHG_LIMIT, PCT_CHG_LIMIT),
+            step=0.5,
+            help="滑块在两端时该侧不限（包括新股首日等超过 ±20% 的涨跌幅）"
+        )
+
+        industry_options = sorted(snapshot['industry'].dropna().unique())
+        industries = st.multiselect("行业", industry_options)
+
+        st.header("排序")
+        sort_label = st.selectbox("排序字段", list(SORT_OPTIONS.keys()))
+        ascending = st.checkbox("升序", value=False)
+        limit = st.number_input("最多显示", min_value=10, max_value=5000, value=100, step=10)
+
+    started = time.perf_counter()
+    result = screen(
+        snapshot,
+        above_ma=above_ma.replace("M", "ma") if above_ma != "不限" else None,
+        vol_ratio_min=vol_ratio_min or None,
+        vol_ratio_max=vol_ratio_max or None,
+        pct_chg_min=pct_chg_min if pct_chg_min > -PCT_CHG_LIMIT else None,
+        pct_chg_max=pct_chg_max if pct_chg_max < PCT_CHG_LIMIT else None,
+        industries=industries,
+        sort_by=SORT_OPTIONS[sort_label],
+        ascending=ascending,
+        limit=int(limit)
+    )
+    elapsed = time.perf_counter() - started
+    get_metrics().observe("compute", "screen", elapsed)
+    elapsed_ms = elapsed * 1000
+
+    st.subheader(f"选股结果（{len(result)} 只，耗时 {elapsed_ms:.1f} 毫秒）")
+    columns = [c for c in SCREENER_COLUMNS if c in result.columns]
+    with timer("render", "screener"):
+        st.dataframe(
+            result[columns].rename(columns=SCREENER_COLUMNS).round(2),
+            use_container_width=True,
+            hide_index=True
+        )
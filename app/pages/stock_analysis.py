@@ -1,98 +1,109 @@
+import re
 import streamlit as st
-import pandas as pd
-import tushare as ts
 from datetime import datetime, timedelta
 from app.auth.middleware import require_auth
+from app.components.chart import CHART_COLUMNS, price_chart
+from app.components.export import export_panel
+from app.components.table import paged_table
+from app.database.session import get_session
+from app.market.adjust import ADJUST_NAMES
+from app.market.indicators import MA_WINDOWS
+from app.market.query import SUMMARY_COLUMNS, summarize_stock_frames
+from app.market.symbols import get_symbol_registry
+from app.market.tushare_client import get_tushare_client
+from app.metrics import timer
+from app.services.market_data import COLUMN_NAMES, DEFAULT_COLUMNS, StockQuery, query_stock_data
+from app.services.watchlist import get_watchlist, add_to_watchlist, remove_from_watchlist
 
 @require_auth
 def stock_analysis_page():
     """股票数据分析页面"""
-    # 设置 Tushare Token
-    token = st.secrets["TUSHARE_TOKEN"]
-    ts.set_token(token)
-    pro = ts.pro_api()
+    # 获取共享的 Tushare 客户端（限流、重试并合并相同请求）
+    pro = get_tushare_client(st.secrets["TUSHARE_TOKEN"])
 
-    # 定义列名映射
-    COLUMN_NAMES = {
+    # 股票代码注册表（每个进程只加载一次股票列表）
+    registry = get_symbol_registry()
+
+    # 当前用户的自选股
+    user_id = st.session_state.user["id"]
+    db = get_session()
+    try:
+        watchlist = get_watchlist(db, user_id)
+    finally:
+        db.close()
+
+    # 批量查询汇总列名映射
+    SUMMARY_NAMES = {
         'ts_code': '股票代码',
         'stock_name': '股票名称',
-        'trade_date': '日期',
-        'open': '开盘价',
-        'close': '收盘价',
-        'high': '最高价',
-        'low': '最低价',
-        'price_range': '最高最低差价',
-        'amplitude': 'T涨幅差',
-        'pct_chg': '涨跌幅%',
-        'ma3': 'M3',
-        'ma5': 'M5',
-        'ma10': 'M10',
-        'ma20': 'M20',
-        'ma30': 'M30',
-        'ma50': 'M50',
-        'ma120': 'M120',
-        'vol': '成交量',
-        'vol_ratio': '量比',
-        'turnover_rate': '换手率'
+        'days': '数据天数',
+        'start_close': '期初收盘价',
+        'last_close': '期末收盘价',
+        'period_return': '区间涨跌幅%',
+        'high': '期间最高价',
+        'low': '期间最低价',
+        'avg_vol_ratio': '平均量比'
     }
 
-    stocks = pd.read_csv("data/stock_list.csv")
-
-    @st.cache_data
-    def get_stock_data(ts_code, start_date, end_date):
-        """获取股票数据并计算技术指标"""
-        try:
-            # 获取日线数据
-            df = pro.daily(ts_code=ts_code, start_date=start_date, end_date=end_date)
-            
-            if df.empty:
-                return None
-                
-            # 获取基本信息
-            # basic_info = pro.stock_basic(ts_code=ts_code, fields='ts_code,name')
-            basic_info = stocks[stocks['ts_code'] == ts_code]
-            stock_name = basic_info.iloc[0]['name'] if not basic_info.empty else ''
-            
-            # 按日期降序排序
-            df = df.sort_values('trade_date', ascending=True)
-            
-            # 计算技术指标
-            # 移动平均线
-            for ma in [3, 5, 10, 20, 30, 50, 120]:
-                df[f'ma{ma}'] = df['close'].rolling(window=ma).mean().round(2)
-                
-            # 最高最低差价
-            df['price_range'] = (df['high'] - df['low']).round(2)
-            
-            # 计算量比（当日成交量/过去5日平均成交量）
-            df['vol_ratio'] = (df['vol'] / df['vol'].rolling(window=5).mean()).round(2)
-            
-            # 计算T幅度差 (收盘价 - 开盘价)
-            df['amplitude'] = (df['close'] - df['open']).round(2)
-            
-            # 涨跌幅保留2位小数
-            df['pct_chg'] = df['pct_chg'].round(2)
-            
-            # 添加股票名称
-            df['stock_name'] = stock_name
-
-            df = df.sort_values('trade_date', ascending=False)
-            
-            return df
-        except Exception as e:
-            st.error(f"获取数据时发生错误: {str(e)}")
-            return None
-
     # 创建侧边栏输入
     with st.sidebar:
         st.header("查询参数")
         
-        # 股票代码输入
-        stock_code = st.text_input(
-            "股票代码",
-            value="000839.SZ",
-            help="000839.SZ（中信国安）"
-        )
+        query_mode = st.radio("查询模式", ["单只股票", "批量查询", "自选股"], horizontal=True)
+
+        if query_mode == "单只股票":
+            # 股票代码输入
+            stock_code = st.text_input(
+                "股票代码",
+                value="000839.SZ",
+                help="支持代码、名称或拼音首字母，如 000839.SZ / 中信国安 / zxga"
+            )
+
+            # 按代码、名称或拼音首字母搜索匹配的股票
+            if stock_code and not registry.resolve(stock_code):
+                matches = registry.search(stock_code)
+                if matches:
+                    choice = st.selectbox(
+                        "匹配的股票",
+                        matches,
+                        format_func=lambda info: f"{info.ts_code} {info.name}"
+                    )
+                    stock_code = choice.ts_code
+            stock_codes = [stock_code] if stock_code else []
+
+            ts_code = registry.resolve(stock_code) if stock_code else None
+            if ts_code and ts_code not in watchlist and st.button("加入自选"):
+                db = get_session()
+                try:
+                    add_to_watchlist(db, user_id, ts_code)
+                finally:
+                    db.close()
+                st.rerun()
+        elif query_mode == "自选股":
+            stock_codes = watchlist
+            if not watchlist:
+                st.info("暂无自选股，可在单只股票模式下加入")
+            else:
+                removed = st.multiselect(
+                    "自选股",
+                    watchlist,
+                    format_func=lambda code: f"{code} {registry.name(code)}",
+                    placeholder="选择要移除的股票"
+                )
+                if removed and st.button("移出自选"):
+                    db = get_session()
+                    try:
+                        remove_from_watchlist(db, user_id, removed)
+                    finally:
+                        db.close()
+                    st.rerun()
+        else:
+            codes_text = st.text_area(
+                "股票代码列表",
+                value="000001.SZ\n600000.SH",
+                help="多个代码用逗号、空格或换行分隔"
+            )
+            stock_codes = [code for code in re.split(r"[\s,，]+", codes_text) if code]
         
         # 日期选择
         col1, col2 = st.columns(2)
@@ -106,57 +117,109 @@ def stock_analysis_page():
                 "结束日期",
                 value=datetime.now()
             )
+
+        # 复权方式（复权因子存储在本地，切换不会重新请求接口）
+        adj = st.radio(
+            "复权方式",
+            list(ADJUST_NAMES),
+            format_func=ADJUST_NAMES.get,
+            horizontal=True
+        )
             
         # 选择显示的列
         st.header("显示设置")
-        all_columns = list(COLUMN_NAMES.values())
-        default_columns = ['股票代码', '股票名称', '日期', '最高价', '最低价', '开盘价', '收盘价', 
-                          'T涨幅差', '涨跌幅%', 'M3', 'M5', 'M10', 'M20', 'M30', 'M50', 'M120',
-                          '最高最低差价']
         selected_columns = st.multiselect(
             "选择要显示的列",
-            options=all_columns,
-            default=default_columns
+            options=list(COLUMN_NAMES),
+            default=DEFAULT_COLUMNS,
+            format_func=COLUMN_NAMES.get
         )
+        show_chart = st.checkbox("显示K线图", value=True, help="均线取所选列中的均线")
 
     # 查询按钮
     if st.sidebar.button("查询"):
-        if not stock_code:
+        if not stock_codes:
             st.error("请输入代码")
+            return
+
+        # 只计算显示和统计需要的列
+        if query_mode == "单只股票":
+            extra_columns = ['high', 'low']
         else:
-            # 转换日期格式
-            start_date_str = start_date.strftime("%Y%m%d")
-            end_date_str = end_date.strftime("%Y%m%d")
-            
-            # 获取数据
-            with st.spinner("正在获取数据..."):
-                df = get_stock_data(stock_code, start_date_str, end_date_str)
-                
-            if df is not None and not df.empty:
-                # 重命名列
-                df_display = df.copy()
-                for old_name, new_name in COLUMN_NAMES.items():
-                    if old_name in df_display.columns:
-                        df_display = df_display.rename(columns={old_name: new_name})
-                
-                # 选择要显示的列
-                df_display = df_display[selected_columns]
-                
-                # 显示数据表格
-                st.dataframe(
-                    df_display,
-                    use_container_width=True,
-                    hide_index=True
-                )
-                
-                # 显示统计信息
-                st.subheader("数据统计")
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("数据天数", len(df))
-                with col2:
-                    st.metric("期间最高价", df['high'].max())
-                with col3:
-                    st.metric("期间最低价", df['low'].min())
-            else:
-                st.error("未找到数据，请检查股票代码和日期范围是否正确") 
\ No newline at end of file
+            extra_columns = SUMMARY_COLUMNS
+        if show_chart:
+            extra_columns = extra_columns + CHART_COLUMNS
+        try:
+            query = StockQuery(
+                symbols=tuple(stock_codes),
+                start_date=start_date,
+                end_date=end_date,
+                adj=adj,
+                columns=tuple(dict.fromkeys(selected_columns + extra_columns))
+            )
+        except ValueError as e:
+            st.error(str(e))
+            return
+
+        # 并发获取所有股票的数据
+        with st.spinner(f"正在获取 {len(stock_codes)} 只股票的数据..." if len(stock_codes) > 1 else "正在获取数据..."):
+            result = query_stock_data(query, pro)
+        if result.unknown:
+            st.warning(f"无法识别的代码：{', '.join(result.unknown)}")
+        if result.errors:
+            st.warning("以下股票获取失败：" + "；".join(f"{k}（{v}）" for k, v in result.errors.items()))
+
+        # 查询结果保存在服务端会话中，翻页、排序和筛选时不再重新查询
+        st.session_state.stock_query = {
+            "id": st.session_state.get("stock_query", {}).get("id", 0) + 1,
+            "mode": query_mode,
+            "query": query,
+            "data": result.data
+        }
+        if result.data.empty:
+            st.error("未找到数据，请检查股票代码和日期范围是否正确")
+
+    stored = st.session_state.get("stock_query")
+    if not stored or stored["data"].empty:
+        return
+
+    df = stored["data"]
+    ma_columns = [f"ma{window}" for window in MA_WINDOWS if f"ma{window}" in selected_columns]
+    if stored["mode"] == "单只股票":
+        if show_chart:
+            price_chart(df, ma_columns, COLUMN_NAMES)
+        paged_table(df, selected_columns, f"stock_table_{stored['id']}", COLUMN_NAMES)
+
+        # 显示统计信息
+        st.subheader("数据统计")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("数据天数", len(df))
+        with col2:
+            st.metric("期间最高价", df['high'].max())
+        with col3:
+            st.metric("期间最低价", df['low'].min())
+    else:
+        st.subheader("汇总")
+        summary = summarize_stock_frames(df)
+        with timer("render", "summary"):
+            st.dataframe(
+                summary.rename(columns=SUMMARY_NAMES),
+                use_container_width=True,
+                hide_index=True
+            )
+
+        if show_chart:
+            st.subheader("K线图")
+            chart_code = st.selectbox(
+                "股票",
+                sorted(df['ts_code'].unique()),
+                format_func=lambda code: f"{code} {registry.name(code)}",
+                key=f"chart_code_{stored['id']}"
+            )
+            price_chart(df[df['ts_code'] == chart_code], ma_columns, COLUMN_NAMES)
+
+        st.subheader("明细")
+        paged_table(df, selected_columns, f"stock_table_{stored['id']}", COLUMN_NAMES)
+
+    export_panel(stored["query"], pro, selected_columns, f"stock_export_{stored['id']}")
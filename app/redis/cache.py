@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+import pyarrow as pa
+import redis
+
+from app.config import FRAME_CACHE_REFRESH_TIME
+from app.metrics import get_metrics, timed, timer
+from app.redis.client import get_redis
+
+# 缓存键前缀与命中统计键
+FRAME_KEY_PREFIX = "frame:"
+STATS_KEY = "frame_cache:stats"
+
+# A 股收盘时间按北京时间计算
+MARKET_TZ = ZoneInfo("Asia/Shanghai")
+
+
+def seconds_until_market_time(clock: str, now: Optional[datetime] = None) -> int:
+    """距离下一个工作日北京时间 clock（HH:MM）的秒数，周末顺延到周一"""
+    now = now or datetime.now(MARKET_TZ)
+    hour, minute = (int(part) for part in clock.split(":"))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    while target.weekday() >= 5:
+        target += timedelta(days=1)
+    return max(1, int((target - now).total_seconds()))
+
+
+def seconds_until_refresh(now: Optional[datetime] = None) -> int:
+    """距离下一次收盘数据更新的秒数（缓存在此之后过期）"""
+    return seconds_until_market_time(FRAME_CACHE_REFRESH_TIME, now)
+
+
+@timed("transform")
+def serialize_frame(df: pd.DataFrame) -> bytes:
+    """DataFrame 序列化为压缩的 Arrow IPC 字节流"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+@timed("transform")
+def deserialize_frame(data: bytes, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """从 Arrow IPC 字节流还原 DataFrame，指定 columns 时只转换这些列"""
+    table = pa.ipc.open_stream(data).read_all()
+    if columns is not None:
+        table = table.select([column for column in columns if column in table.column_names])
+    return table.to_pandas()
+
+
+def get_frame(key: str, columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    """读取缓存的 DataFrame，未命中或 Redis 不可用时返回 None"""
+    return get_first_frame([key], columns)
+
+
+def get_first_frame(keys: List[str], columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+    """按顺序查找多个候选键（一次 MGET），返回第一个命中的 DataFrame"""
+    try:
+        redis_client = get_redis()
+        with timer("redis", "frame_get"):
+            values = redis_client.mget([FRAME_KEY_PREFIX + key for key in keys])
+        data = next((value for value in values if value is not None), None)
+        redis_client.hincrby(STATS_KEY, "hits" if data is not None else "misses", 1)
+    except redis.RedisError:
+        get_metrics().inc("redis_errors_total")
+        return None
+    get_metrics().inc("cache_requests_total", cache="frame", result="hit" if data is not None else "miss")
+    return deserialize_frame(data, columns) if data is not None else None
+
+
+def set_frame(key: str, df: pd.DataFrame, ttl: Optional[int] = None) -> None:
+    """缓存 DataFrame，默认在下一次收盘数据更新时过期"""
+    data = serialize_frame(df)
+    try:
+        with timer("redis", "frame_set"):
+            get_redis().setex(FRAME_KEY_PREFIX + key, ttl or seconds_until_refresh(), data)
+    except redis.RedisError:
+        get_metrics().inc("redis_errors_total")
+
+
+def get_cache_stats() -> dict:
+    """获取所有进程共享的缓存命中统计"""
+    stats = {k.decode(): int(v) for k, v in get_redis().hgetall(STATS_KEY).items()}
+    hits, misses = stats.get("hits", 0), stats.get("misses", 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else 0.0
+    }
+
+
+def _collect_cache_stats() -> dict:
+    try:
+        return get_cache_stats()
+    except redis.RedisError:
+        return {}
+
+
+# 导出所有进程共享的缓存命中统计
+get_metrics().register_collector("frame_cache", _collect_cache_stats)
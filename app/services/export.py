@@ -0,0 +1,162 @@
+import gzip
+import io
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from app.config import EXPORT_PREFETCH
+from app.market.query import CATEGORY_COLUMNS, iter_stock_frames
+from app.market.tushare_client import TushareClient
+from app.services.market_data import COLUMN_NAMES, StockQuery, resolve_symbols
+
+# 导出格式（格式 -> 显示名称）
+EXPORT_FORMATS = {
+    'parquet': 'Parquet',
+    'csv': 'CSV（gzip 压缩）'
+}
+
+# 各格式的文件后缀和 MIME 类型
+EXPORT_SUFFIXES = {'parquet': '.parquet', 'csv': '.csv.gz'}
+EXPORT_MIME_TYPES = {'parquet': 'application/vnd.apache.parquet', 'csv': 'application/gzip'}
+
+# Parquet 每个行组的行数（攒够后写出，内存中最多保留一个行组）
+ROW_GROUP_ROWS = 200_000
+
+# CSV 中浮点数保留的小数位数
+CSV_FLOAT_DECIMALS = 4
+
+# 字符串和日期列的类型，其余数据列按 float32 / int64 导出
+STRING_COLUMNS = {'ts_code', 'stock_name'}
+INTEGER_COLUMNS = {'vol'}
+
+
+@dataclass
+class ExportResult:
+    """导出结果"""
+    rows: int = 0
+    symbols: int = 0  # 有数据的股票数
+    errors: Dict[str, str] = field(default_factory=dict)  # 股票代码 -> 错误信息
+    unknown: List[str] = field(default_factory=list)  # 无法识别的输入
+
+
+def export_schema(columns: List[str]) -> pa.Schema:
+    """导出文件的固定列类型（列名为显示名称）
+
+    每只股票的紧凑类型不同（如成交量按取值范围降为 uint16/uint32），
+    统一成固定的类型后各块可以写入同一个文件。
+    """
+    fields = []
+    for column in columns:
+        if column == 'trade_date':
+            arrow_type = pa.date32()
+        elif column in STRING_COLUMNS:
+            arrow_type = pa.string()
+        elif column in INTEGER_COLUMNS:
+            arrow_type = pa.int64()
+        else:
+            arrow_type = pa.float32()
+        fields.append(pa.field(COLUMN_NAMES[column], arrow_type))
+    return pa.schema(fields)
+
+
+def _normalize_chunk(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """投影到导出列（数据源不提供的列为空），分类列还原为字符串"""
+    chunk = df.reindex(columns=columns)
+    for column in CATEGORY_COLUMNS:
+        if column in chunk.columns:
+            chunk[column] = chunk[column].astype(str)
+    return chunk
+
+
+def iter_export_chunks(
+    query: StockQuery,
+    client: TushareClient,
+    result: ExportResult,
+    progress: Optional[Callable[[int, int], None]] = None,
+    prefetch: int = EXPORT_PREFETCH
+) -> Iterator[pd.DataFrame]:
+    """逐只股票产出导出列的数据块，失败和无数据的股票记录到 result 中
+
+    progress(已处理, 总数) 在每只股票处理后调用。
+    """
+    ts_codes, result.unknown = resolve_symbols(query.symbols)
+    columns = list(query.columns)
+    frames = iter_stock_frames(
+        ts_codes,
+        query.start_date.strftime("%Y%m%d"),
+        query.end_date.strftime("%Y%m%d"),
+        client,
+        columns=columns,
+        adj=query.adj,
+        prefetch=prefetch
+    )
+    for done, (ts_code, df, error) in enumerate(frames, start=1):
+        if error:
+            result.errors[ts_code] = error
+        else:
+            result.symbols += 1
+            result.rows += len(df)
+            yield _normalize_chunk(df, columns)
+        if progress:
+            progress(done, len(ts_codes))
+
+
+def write_parquet(chunks: Iterable[pd.DataFrame], sink: BinaryIO, columns: List[str]) -> None:
+    """把数据块写为一个 Parquet 文件（zstd 压缩），小块合并为行组后写出"""
+    schema = export_schema(columns)
+    names = [COLUMN_NAMES[column] for column in columns]
+    buffered: List[pa.Table] = []
+    buffered_rows = 0
+    with pq.ParquetWriter(sink, schema, compression='zstd') as writer:
+        for chunk in chunks:
+            chunk.columns = names
+            buffered.append(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            buffered_rows += len(chunk)
+            if buffered_rows >= ROW_GROUP_ROWS:
+                writer.write_table(pa.concat_tables(buffered), row_group_size=ROW_GROUP_ROWS)
+                buffered, buffered_rows = [], 0
+        if buffered:
+            writer.write_table(pa.concat_tables(buffered), row_group_size=ROW_GROUP_ROWS)
+
+
+def write_csv(chunks: Iterable[pd.DataFrame], sink: BinaryIO, columns: List[str]) -> None:
+    """把数据块写为 gzip 压缩的 CSV（UTF-8 带 BOM，Excel 可以直接打开中文列名）"""
+    names = [COLUMN_NAMES[column] for column in columns]
+    with gzip.GzipFile(fileobj=sink, mode='wb') as compressed:
+        text = io.TextIOWrapper(compressed, encoding='utf-8-sig', newline='')
+        text.write(",".join(names) + "\n")
+        for chunk in chunks:
+            chunk.to_csv(
+                text,
+                header=False,
+                index=False,
+                float_format=f"%.{CSV_FLOAT_DECIMALS}f",
+                date_format="%Y-%m-%d"
+            )
+        # 不关闭 sink，由调用方处理
+        text.flush()
+        text.detach()
+
+
+def export_stock_data(
+    query: StockQuery,
+    client: TushareClient,
+    sink: BinaryIO,
+    fmt: str = 'parquet',
+    progress: Optional[Callable[[int, int], None]] = None
+) -> ExportResult:
+    """按查询条件逐只股票获取数据并流式写入 sink（二进制文件对象）
+
+    任意时刻内存中只有正在获取的少量股票和一个待写出的行组，与股票数和日期范围无关；
+    导出不读写 Redis 结果缓存。列按 query.columns 的顺序输出，列名为显示名称。
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"未知的导出格式: {fmt}")
+    result = ExportResult()
+    chunks = iter_export_chunks(query, client, result, progress)
+    write = write_parquet if fmt == 'parquet' else write_csv
+    write(chunks, sink, list(query.columns))
+    return result
@@ -0,0 +1,114 @@
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from app.market.adjust import ADJUST_NAMES
+from app.market.query import load_stock_frames
+from app.market.symbols import get_symbol_registry
+from app.market.tushare_client import TushareClient
+
+# 列名映射（数据列 -> 显示名称）
+COLUMN_NAMES = {
+    'ts_code': '股票代码',
+    'stock_name': '股票名称',
+    'trade_date': '日期',
+    'open': '开盘价',
+    'close': '收盘价',
+    'high': '最高价',
+    'low': '最低价',
+    'price_range': '最高最低差价',
+    'amplitude': 'T涨幅差',
+    'pct_chg': '涨跌幅%',
+    'ma3': 'M3',
+    'ma5': 'M5',
+    'ma10': 'M10',
+    'ma20': 'M20',
+    'ma30': 'M30',
+    'ma50': 'M50',
+    'ma120': 'M120',
+    'vol': '成交量',
+    'vol_ratio': '量比',
+    'turnover_rate': '换手率'
+}
+
+# 完整的 ts_code 格式，注册表中没有时（如股票列表未下载）也直接查询
+TS_CODE_PATTERN = re.compile(r"^\d{6}\.(SZ|SH|BJ)$")
+
+# 默认显示的列
+DEFAULT_COLUMNS = [
+    'ts_code', 'stock_name', 'trade_date', 'high', 'low', 'open', 'close',
+    'amplitude', 'pct_chg', 'ma3', 'ma5', 'ma10', 'ma20', 'ma30', 'ma50', 'ma120',
+    'price_range'
+]
+
+
+@dataclass(frozen=True)
+class StockQuery:
+    """股票数据查询条件
+
+    symbols 为股票代码（000001.SZ / 000001）；columns 为 COLUMN_NAMES 中的数据列，只有这些列会被计算和返回；
+    adj 为复权方式（None / qfq / hfq）。
+    """
+    symbols: Tuple[str, ...]
+    start_date: date
+    end_date: date
+    columns: Tuple[str, ...] = tuple(COLUMN_NAMES)
+    adj: Optional[str] = None
+
+    def __post_init__(self):
+        unknown = [column for column in self.columns if column not in COLUMN_NAMES]
+        if unknown:
+            raise ValueError(f"未知的数据列: {', '.join(unknown)}")
+        if self.adj not in ADJUST_NAMES:
+            raise ValueError(f"未知的复权方式: {self.adj}")
+        if self.start_date > self.end_date:
+            raise ValueError("开始日期不能晚于结束日期")
+
+
+@dataclass
+class StockQueryResult:
+    """查询结果"""
+    data: pd.DataFrame  # 各股票按日期降序合并的长表，列为请求的数据列
+    errors: Dict[str, str] = field(default_factory=dict)  # 股票代码 -> 错误信息
+    unknown: List[str] = field(default_factory=list)  # 无法识别的输入
+
+
+def resolve_symbols(symbols) -> Tuple[List[str], List[str]]:
+    """把输入的代码解析为 ts_code，返回 (ts_code 列表, 无法识别的输入)"""
+    registry = get_symbol_registry()
+    ts_codes = []
+    unknown = []
+    for symbol in symbols:
+        ts_code = registry.resolve(symbol)
+        if ts_code is None and TS_CODE_PATTERN.match(symbol.strip().upper()):
+            ts_code = symbol.strip().upper()
+        if ts_code:
+            ts_codes.append(ts_code)
+        else:
+            unknown.append(symbol)
+    return ts_codes, unknown
+
+
+def query_stock_data(query: StockQuery, client: TushareClient) -> StockQueryResult:
+    """按查询条件获取股票日线及技术指标
+
+    所有入口共用同一份结果缓存（Redis stock: 命名空间），缓存的完整结果可以满足任意列组合。
+    """
+    ts_codes, unknown = resolve_symbols(query.symbols)
+    if not ts_codes:
+        return StockQueryResult(pd.DataFrame(columns=list(query.columns)), unknown=unknown)
+
+    df, errors = load_stock_frames(
+        ts_codes,
+        query.start_date.strftime("%Y%m%d"),
+        query.end_date.strftime("%Y%m%d"),
+        client,
+        columns=list(query.columns),
+        adj=query.adj
+    )
+    # 数据源不提供的列（如换手率）不会出现在结果中
+    columns = [column for column in query.columns if column in df.columns]
+    return StockQueryResult(df[columns], errors, unknown)
@@ -1,7 +1,8 @@
-from typing import Optional
-from sqlalchemy.orm import Session
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload
 from app.database.models import User, UserApproval
 from app.auth.manager import get_password_hash, verify_password
+from app.auth.session_cache import invalidate_user, invalidate_users
 
 def get_user_by_username(db: Session, username: str) -> Optional[User]:
     """通过用户名获取用户"""
@@ -48,6 +49,8 @@ def approve_user(db: Session, approval_id: int, admin_id: int, approved: bool) -
             user.is_active = True
         db.commit()
         db.refresh(approval)
+        # 用户状态已变化，清除缓存的会话
+        invalidate_user(approval.user.username)
     return approval
 
 def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
@@ -59,9 +62,62 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
         return None
     return user
 
-def get_pending_approvals(db: Session):
-    """获取待审批的用户列表"""
-    return db.query(UserApproval).filter(UserApproval.status == "PENDING").all()
+def bulk_approve_users(db: Session, approval_ids: Iterable[int], admin_id: int, approved: bool) -> int:
+    """批量审批用户，在一个事务中完成，返回实际处理的审批数
+
+    只处理仍为待审批状态的记录，重复提交或其他管理员已处理的记录会被跳过。
+    """
+    approval_ids = list(approval_ids)
+    if not approval_ids:
+        return 0
+
+    # 一次查询取出待处理记录对应的用户
+    rows = (
+        db.query(UserApproval.id, User.id, User.username)
+        .join(User, UserApproval.user_id == User.id)
+        .filter(UserApproval.id.in_(approval_ids), UserApproval.status == "PENDING")
+        .all()
+    )
+    if not rows:
+        return 0
+
+    pending_ids = [row[0] for row in rows]
+    db.query(UserApproval).filter(
+        UserApproval.id.in_(pending_ids),
+        UserApproval.status == "PENDING"
+    ).update(
+        {
+            UserApproval.status: "APPROVED" if approved else "REJECTED",
+            UserApproval.approved_by: admin_id
+        },
+        synchronize_session=False
+    )
+    if approved:
+        db.query(User).filter(User.id.in_({row[1] for row in rows})).update(
+            {User.is_active: True},
+            synchronize_session=False
+        )
+    db.commit()
+
+    # 用户状态已变化，清除缓存的会话
+    invalidate_users(row[2] for row in rows)
+    return len(pending_ids)
+
+def get_pending_approvals(db: Session, page: int = 1, page_size: int = 50) -> Tuple[List[UserApproval], int]:
+    """分页获取待审批的用户列表，返回 (当前页记录, 总数)
+
+    审批记录和用户在同一条查询中加载，渲染时访问 approval.user 不会再产生查询。
+    """
+    query = db.query(UserApproval).filter(UserApproval.status == "PENDING")
+    total = query.count()
+    approvals = (
+        query.options(joinedload(UserApproval.user))
+        .order_by(UserApproval.created_at, UserApproval.id)
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .all()
+    )
+    return approvals, total
 
 def is_admin(user: User) -> bool:
     """检查用户是否为管理员"""
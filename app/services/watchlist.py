@@ -0,0 +1,31 @@
+from typing import List
+from sqlalchemy.orm import Session
+from app.database.models import Watchlist
+
+def get_watchlist(db: Session, user_id: int) -> List[str]:
+    """获取用户的自选股代码列表"""
+    rows = db.query(Watchlist.ts_code).filter(Watchlist.user_id == user_id).order_by(Watchlist.created_at).all()
+    return [row.ts_code for row in rows]
+
+def add_to_watchlist(db: Session, user_id: int, ts_code: str) -> bool:
+    """加入自选股，已存在时返回 False"""
+    exists = db.query(Watchlist.id).filter(Watchlist.user_id == user_id, Watchlist.ts_code == ts_code).first()
+    if exists:
+        return False
+    db.add(Watchlist(user_id=user_id, ts_code=ts_code))
+    db.commit()
+    return True
+
+def remove_from_watchlist(db: Session, user_id: int, ts_codes: List[str]) -> int:
+    """从自选股中移除，返回移除的数量"""
+    count = db.query(Watchlist).filter(
+        Watchlist.user_id == user_id,
+        Watchlist.ts_code.in_(ts_codes)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return count
+
+def get_watchlisted_codes(db: Session) -> List[str]:
+    """获取所有用户自选股的去重代码列表"""
+    rows = db.query(Watchlist.ts_code).distinct().all()
+    return [row.ts_code for row in rows]
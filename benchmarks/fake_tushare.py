@@ -0,0 +1,106 @@
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# 模拟数据的起始日期（早于 README 中的10年历史范围）
+HISTORY_START = "20000101"
+
+# 日线列（与 tushare pro.daily 一致）
+DAILY_COLUMNS = [
+    'ts_code', 'trade_date', 'open', 'high', 'low', 'close',
+    'pre_close', 'change', 'pct_chg', 'vol', 'amount'
+]
+
+
+def trading_days(start_date: str = HISTORY_START, end_date: Optional[str] = None) -> pd.DatetimeIndex:
+    """模拟的交易日历（周一至周五）"""
+    return pd.bdate_range(start_date, end_date or pd.Timestamp.today().strftime("%Y%m%d"))
+
+
+def synthetic_bars(ts_code: str, days: pd.DatetimeIndex) -> pd.DataFrame:
+    """生成单只股票的模拟日线（按代码确定随机种子，同一代码每次结果相同）"""
+    rng = np.random.default_rng(zlib.crc32(ts_code.encode()))
+    n = len(days)
+    close = np.round(10.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, n))), 2)
+    pre_close = np.concatenate([[close[0]], close[:-1]])
+    open_ = np.round(pre_close * (1 + rng.normal(0, 0.005, n)), 2)
+    high = np.round(np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, n)), 2)
+    low = np.round(np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, n)), 2)
+    vol = np.round(rng.lognormal(11, 0.5, n), 2)
+    return pd.DataFrame({
+        'ts_code': ts_code,
+        'trade_date': days.strftime("%Y%m%d"),
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'pre_close': pre_close,
+        'change': np.round(close - pre_close, 2),
+        'pct_chg': np.round((close / pre_close - 1) * 100, 4),
+        'vol': vol,
+        'amount': np.round(vol * close / 10, 3)
+    })
+
+
+def synthetic_adj_factor(ts_code: str, days: pd.DatetimeIndex) -> pd.DataFrame:
+    """生成单只股票的模拟复权因子（大约每年除权一次）"""
+    rng = np.random.default_rng(zlib.crc32(ts_code.encode()) + 1)
+    steps = np.where(rng.random(len(days)) < 1 / 250, rng.uniform(1.01, 1.1, len(days)), 1.0)
+    return pd.DataFrame({
+        'ts_code': ts_code,
+        'trade_date': days.strftime("%Y%m%d"),
+        'adj_factor': np.round(np.cumprod(steps), 4)
+    })
+
+
+class FakePro:
+    """本地模拟的 tushare pro 接口（daily / adj_factor / trade_cal）
+
+    数据按股票代码确定性生成，不访问网络，结果在多次运行之间完全一致；
+    latency 为每次调用额外等待的秒数，用于模拟接口的网络延迟。
+    返回值与 tushare 一致：按交易日降序，日期为 YYYYMMDD 字符串。
+    """
+
+    def __init__(self, latency: float = 0.0, end_date: Optional[str] = None):
+        self.latency = latency
+        self.days = trading_days(end_date=end_date)
+        self.calls: Dict[str, int] = {}
+        self._frames: Dict[tuple, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    def _history(self, api_name: str, ts_code: str) -> pd.DataFrame:
+        key = (api_name, ts_code)
+        with self._lock:
+            df = self._frames.get(key)
+        if df is None:
+            generate = synthetic_bars if api_name == "daily" else synthetic_adj_factor
+            df = generate(ts_code, self.days).iloc[::-1].reset_index(drop=True)
+            with self._lock:
+                self._frames[key] = df
+        return df
+
+    def query(self, api_name: str, **params) -> pd.DataFrame:
+        with self._lock:
+            self.calls[api_name] = self.calls.get(api_name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        start_date = params.get("start_date") or HISTORY_START
+        end_date = params.get("end_date") or "99991231"
+        if api_name == "trade_cal":
+            dates = self.days.strftime("%Y%m%d")
+            dates = dates[(dates >= start_date) & (dates <= end_date)]
+            return pd.DataFrame({'exchange': params.get("exchange", "SSE"), 'cal_date': dates, 'is_open': 1})
+        if api_name not in ("daily", "adj_factor"):
+            raise ValueError(f"FakePro 不支持的接口: {api_name}")
+        if "ts_code" not in params:
+            raise ValueError("FakePro 只支持按 ts_code 查询")
+
+        df = self._history(api_name, params["ts_code"])
+        if "trade_date" in params:
+            return df[df['trade_date'] == params["trade_date"]].reset_index(drop=True)
+        return df[(df['trade_date'] >= start_date) & (df['trade_date'] <= end_date)].reset_index(drop=True)
@@ -0,0 +1,297 @@
+import os
+import sys
+import json
+import time
+import logging
+import random
+import argparse
+import tempfile
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 添加项目根目录到 Python 路径
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_tushare import FakePro
+
+# 被测的应用入口（与 streamlit run 使用同一个脚本）
+APP_SCRIPT = str(root_dir / "app" / "main.py")
+
+# 模拟用户的密码（所有用户相同，只计算一次哈希）
+PASSWORD = "load-test-password"
+
+# 单次脚本运行的超时（秒）
+RUN_TIMEOUT = 120
+
+# 统计的步骤：首次打开页面、提交登录、带 token 重新打开页面（恢复会话）、查询
+STEPS = ["page_load", "login", "restore", "query"]
+
+
+def patch_streamlit_globals(token: str) -> None:
+    """让多个 AppTest 会话可以在线程中并发运行
+
+    AppTest 每次运行时安装、结束时清除全局的 Runtime 实例，临时打开 global.appTest 配置，
+    并替换全局的 st.secrets；并发运行时先结束的会话会清除或还原其他会话正在使用的状态。
+    这里让 Runtime.instance() 在实例被清除后沿用最近一次安装的实例，
+    并一次性设置 global.appTest 和全局 secrets（会话不再单独设置）。
+    """
+    import streamlit as st
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.secrets import Secrets
+
+    installed = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            installed[:] = [cls._instance]
+        if not installed:
+            raise RuntimeError("Runtime hasn't been created!")
+        return installed[0]
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or bool(installed))
+    config.set_option("global.appTest", True)
+
+    # 线程中运行脚本时的 bare mode 提示和弃用提示会淹没结果
+    for name, logger in list(logging.Logger.manager.loggerDict.items()):
+        if name.startswith("streamlit") and isinstance(logger, logging.Logger):
+            logger.setLevel(logging.ERROR)
+
+    secrets = Secrets()
+    secrets._secrets = {"TUSHARE_TOKEN": token}
+    st.secrets = secrets
+
+
+def setup_environment(workdir: str, users: int, latency: float, redis_url: Optional[str]) -> List[str]:
+    """初始化 SQLite 数据库、本地存储、Redis 和模拟接口，返回创建的用户名
+
+    配置在导入时读取环境变量，因此应用模块在这里设置完环境变量后才导入。
+    """
+    os.environ["DATABASE_URL"] = f"sqlite:///{Path(workdir) / 'load_test.db'}"
+    os.environ["BAR_STORE_DIR"] = str(Path(workdir) / "bars")
+    os.environ["INDICATOR_STORE_DIR"] = str(Path(workdir) / "indicators")
+    os.environ.setdefault("STOCK_LIST_PATH", str(root_dir / "data" / "stock_list.csv"))
+    if redis_url:
+        os.environ["REDIS_URL"] = redis_url
+
+    import app.redis.client
+    import app.market.tushare_client
+    from app.auth.manager import get_password_hash
+    from app.database.init_db import upgrade_schema
+    from app.database.models import User
+    from app.database.session import SessionLocal
+
+    if not redis_url:
+        import fakeredis
+        app.redis.client.redis_client = fakeredis.FakeRedis()
+
+    # 应用通过 get_tushare_client() 获取共享客户端，预先放入使用模拟接口的客户端
+    app.market.tushare_client._client = app.market.tushare_client.TushareClient(
+        "", rate_per_minute=10 ** 9, pro=FakePro(latency=latency)
+    )
+
+    upgrade_schema()
+    password_hash = get_password_hash(PASSWORD)
+    usernames = [f"load_user_{i}" for i in range(users)]
+    db = SessionLocal()
+    try:
+        db.add_all([
+            User(username=username, email=f"{username}@example.com", password_hash=password_hash, is_active=True)
+            for username in usernames
+        ])
+        db.commit()
+    finally:
+        db.close()
+    return usernames
+
+
+class SessionRecorder:
+    """收集各步骤的耗时和错误（线程安全）"""
+
+    def __init__(self):
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, List[str]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, step: str, seconds: float, error: Optional[str] = None) -> None:
+        with self._lock:
+            if error:
+                self.errors[step].append(error)
+            else:
+                self.timings[step].append(seconds * 1000)
+
+
+def timed_run(at, recorder: SessionRecorder, step: str, check) -> bool:
+    """运行一次脚本并记录耗时，check(at) 返回错误信息（成功时为 None）"""
+    started = time.perf_counter()
+    try:
+        at.run(timeout=RUN_TIMEOUT)
+        error = "; ".join(str(e.value) for e in at.exception) or check(at)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    recorder.record(step, time.perf_counter() - started, error)
+    return error is None
+
+
+def widget(widgets, label: str):
+    """按标签查找控件"""
+    return next(w for w in widgets if w.label == label)
+
+
+def run_session(username: str, symbols: List[str], queries: int, batch_ratio: float,
+                think_time: float, seed: int, recorder: SessionRecorder) -> None:
+    """模拟一个用户：打开登录页、登录、带 token 重新打开页面，然后执行若干次查询"""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=RUN_TIMEOUT)
+    if not timed_run(at, recorder, "page_load", lambda at: None if at.text_input else "登录页未显示"):
+        return
+
+    widget(at.text_input, "用户名").input(username)
+    widget(at.text_input, "密码").input(PASSWORD)
+    widget(at.button, "登录").click()
+    if not timed_run(at, recorder, "login",
+                     lambda at: None if "token" in at.session_state else "; ".join(e.value for e in at.error) or "登录失败"):
+        return
+    token = at.session_state["token"]
+
+    # 刷新浏览器：新的会话只带有 URL 中的 token
+    at = AppTest.from_file(APP_SCRIPT, default_timeout=RUN_TIMEOUT)
+    at.query_params["token"] = token
+    if not timed_run(at, recorder, "restore", lambda at: None if "user" in at.session_state else "会话恢复失败"):
+        return
+
+    for _ in range(queries):
+        time.sleep(think_time * rng.random() * 2)
+        try:
+            # 切换查询模式后重跑一次（不计时），再填写代码和日期
+            if rng.random() < batch_ratio:
+                widget(at.radio, "查询模式").set_value("批量查询")
+                at.run(timeout=RUN_TIMEOUT)
+                widget(at.text_area, "股票代码列表").input("\n".join(rng.sample(symbols, 10)))
+            else:
+                widget(at.radio, "查询模式").set_value("单只股票")
+                at.run(timeout=RUN_TIMEOUT)
+                widget(at.text_input, "股票代码").input(rng.choice(symbols))
+            widget(at.date_input, "开始日期").set_value(datetime.now().date() - timedelta(days=rng.randint(30, 365)))
+            widget(at.button, "查询").click()
+        except Exception as e:
+            recorder.record("query", 0.0, f"{type(e).__name__}: {e}")
+            return
+        timed_run(at, recorder, "query", lambda at: (
+            None if "stock_query" in at.session_state and not at.session_state["stock_query"]["data"].empty
+            else "; ".join(e.value for e in list(at.error) + list(at.warning)) or "查询无结果"
+        ))
+
+
+def run_level(usernames: List[str], symbols: List[str], args, level: int) -> dict:
+    """以 level 个并发会话运行一轮，返回各步骤的延迟分位数和吞吐量"""
+    recorder = SessionRecorder()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=level) as executor:
+        futures = [
+            executor.submit(run_session, usernames[i], symbols, args.queries, args.batch_ratio,
+                            args.think_time, args.seed * 1000 + i, recorder)
+            for i in range(level)
+        ]
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - started
+
+    steps = {}
+    for step in STEPS:
+        timings = np.array(recorder.timings.get(step, []))
+        errors = recorder.errors.get(step, [])
+        steps[step] = {
+            "count": len(timings),
+            "errors": len(errors),
+            "p50_ms": round(float(np.percentile(timings, 50)), 1) if len(timings) else None,
+            "p95_ms": round(float(np.percentile(timings, 95)), 1) if len(timings) else None,
+            "p99_ms": round(float(np.percentile(timings, 99)), 1) if len(timings) else None,
+            "error_samples": sorted(set(errors))[:3]
+        }
+    runs = sum(step["count"] for step in steps.values())
+    return {
+        "sessions": level,
+        "elapsed_s": round(elapsed, 2),
+        "runs_per_s": round(runs / elapsed, 2),
+        "queries_per_s": round(steps["query"]["count"] / elapsed, 2),
+        "steps": steps
+    }
+
+
+def print_level(result: dict) -> None:
+    """输出一轮的结果"""
+    print(f"\n{result['sessions']} sessions in {result['elapsed_s']}s: "
+          f"{result['runs_per_s']} script runs/s, {result['queries_per_s']} queries/s")
+    print(f"  {'step':<10}{'count':>7}{'errors':>8}{'p50':>11}{'p95':>11}{'p99':>11}")
+    for step, stats in result["steps"].items():
+        values = [f"{stats[key]:>9.0f}ms" if stats[key] is not None else f"{'-':>11}" for key in ("p50_ms", "p95_ms", "p99_ms")]
+        print(f"  {step:<10}{stats['count']:>7}{stats['errors']:>8}" + "".join(values))
+        for sample in stats["error_samples"]:
+            print(f"    error: {sample}")
+
+
+def find_saturation(results: List[dict], min_gain: float = 0.1) -> Optional[int]:
+    """吞吐量增幅低于 min_gain 的第一个并发数（即单进程开始饱和的位置）"""
+    for previous, current in zip(results, results[1:]):
+        if current["runs_per_s"] < previous["runs_per_s"] * (1 + min_gain):
+            return previous["sessions"]
+    return None
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="模拟多个并发会话，测量单个进程的延迟分位数和吞吐量")
+    parser.add_argument("--sessions", default="1,2,4,8,16", help="并发会话数，逗号分隔多个值时依次测量")
+    parser.add_argument("--queries", type=int, default=5, help="每个会话执行的查询次数")
+    parser.add_argument("--batch-ratio", type=float, default=0.2, help="批量查询（10只股票）占查询的比例")
+    parser.add_argument("--think-time", type=float, default=0.0, help="两次查询之间的平均间隔（秒）")
+    parser.add_argument("--latency", type=float, default=0.05, help="模拟接口每次调用的延迟（秒）")
+    parser.add_argument("--redis-url", help="使用本地 redis-server（建议单独的库），默认使用进程内的 fakeredis")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--output", help="把结果保存为 JSON 文件")
+    args = parser.parse_args()
+
+    levels = sorted({int(value) for value in args.sessions.split(",") if value})
+    with tempfile.TemporaryDirectory(prefix="smart-inv-load-") as workdir:
+        print("Preparing database, stores and users...")
+        usernames = setup_environment(workdir, max(levels), args.latency, args.redis_url)
+        patch_streamlit_globals("load-test")
+        symbols = pd.read_csv(os.environ["STOCK_LIST_PATH"], dtype=str)["ts_code"].tolist()
+
+        results = []
+        for level in levels:
+            results.append(run_level(usernames, symbols, args, level))
+            print_level(results[-1])
+
+    saturation = find_saturation(results)
+    if saturation:
+        print(f"\nThroughput stops scaling at about {saturation} concurrent sessions.")
+    else:
+        print("\nThroughput was still scaling at the highest concurrency tested.")
+
+    if args.output:
+        report = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+            "saturation_sessions": saturation,
+            "levels": results
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
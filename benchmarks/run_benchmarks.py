@@ -0,0 +1,251 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import count
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# 添加项目根目录到 Python 路径
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks.fake_tushare import FakePro
+
+# 固定的查询区间（模拟数据截止到 END_DATE，结果不随运行日期变化）
+START_DATE = "20150101"
+END_DATE = "20241231"
+
+# 批量查询和表格分页使用的股票数
+BATCH_SIZE = 20
+
+
+@dataclass
+class Case:
+    """一个基准测试用例"""
+    name: str
+    run: Callable[[], object]
+    iterations: int = 20
+    setup: Optional[Callable[[], None]] = None  # 每次运行前执行，不计入耗时
+    warmup: int = 2
+
+
+def measure(case: Case) -> Dict[str, float]:
+    """运行用例，返回耗时分布（毫秒）和 Python 内存峰值（KB）
+
+    内存峰值在单独的一次运行中用 tracemalloc 统计，不影响耗时数据。
+    """
+    for _ in range(case.warmup):
+        if case.setup:
+            case.setup()
+        case.run()
+
+    timings = []
+    for _ in range(case.iterations):
+        if case.setup:
+            case.setup()
+        started = time.perf_counter()
+        case.run()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    if case.setup:
+        case.setup()
+    tracemalloc.start()
+    try:
+        case.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings = np.array(timings)
+    return {
+        "iterations": case.iterations,
+        "mean_ms": round(float(timings.mean()), 4),
+        "median_ms": round(float(np.median(timings)), 4),
+        "p95_ms": round(float(np.percentile(timings, 95)), 4),
+        "min_ms": round(float(timings.min()), 4),
+        "max_ms": round(float(timings.max()), 4),
+        "peak_kb": round(peak / 1024, 1)
+    }
+
+
+def build_cases(latency: float) -> List[Case]:
+    """创建全部用例（需在设置存储目录等环境变量之后调用）"""
+    # 配置在导入时读取环境变量，因此在这里才导入应用模块
+    import fakeredis
+
+    import app.redis.client
+    from app.auth.manager import create_access_token, decode_access_token, get_password_hash, verify_password
+    from app.market.query import compact_frame, load_stock_frame
+    from app.market.symbols import SymbolRegistry, get_symbol_registry
+    from app.market.tushare_client import TushareClient
+    from app.components.table import page_frame, to_display_frame
+    from app.services.market_data import COLUMN_NAMES, DEFAULT_COLUMNS, StockQuery, query_stock_data
+
+    # 结果缓存使用进程内的 fakeredis，不读写真实的 Redis
+    redis = fakeredis.FakeRedis()
+    app.redis.client.redis_client = redis
+    client = TushareClient("", rate_per_minute=10 ** 9, pro=FakePro(latency=latency, end_date=END_DATE))
+
+    stocks = pd.read_csv(os.environ["STOCK_LIST_PATH"], dtype=str)
+    ts_codes = stocks["ts_code"].tolist()
+    registry = get_symbol_registry()
+
+    # 冷启动用例每次使用本地尚未存储的股票；其余用例使用预先入库的股票
+    cold_codes = iter(ts_codes[BATCH_SIZE:])
+    warm_codes = ts_codes[:BATCH_SIZE]
+    for ts_code in warm_codes:
+        load_stock_frame(ts_code, START_DATE, END_DATE, client)
+    warm_cycle = count()
+
+    def next_warm() -> str:
+        return warm_codes[next(warm_cycle) % len(warm_codes)]
+
+    query = StockQuery(
+        tuple(warm_codes),
+        datetime.strptime(START_DATE, "%Y%m%d").date(),
+        datetime.strptime(END_DATE, "%Y%m%d").date(),
+        tuple(DEFAULT_COLUMNS)
+    )
+    result = query_stock_data(query, client).data
+    raw = pd.concat(
+        [client.daily(ts_code=ts_code, start_date=START_DATE, end_date=END_DATE) for ts_code in warm_codes],
+        ignore_index=True
+    )
+
+    inputs = [code for row in stocks.itertuples(index=False) for code in (row.ts_code, row.symbol)]
+    prefixes = [name[:2] for name in stocks["name"].head(100)] + [code[:4] for code in ts_codes[:100]]
+
+    password_hash = get_password_hash("benchmark-password")
+    token = create_access_token({"sub": "benchmark"})
+
+    return [
+        Case("fetch_indicators_cold",
+             lambda: load_stock_frame(next(cold_codes), START_DATE, END_DATE, client),
+             setup=redis.flushall),
+        Case("fetch_indicators_store",
+             lambda: load_stock_frame(next_warm(), START_DATE, END_DATE, client),
+             setup=redis.flushall),
+        Case("fetch_indicators_cached",
+             lambda: load_stock_frame(warm_codes[0], START_DATE, END_DATE, client),
+             iterations=100, setup=lambda: load_stock_frame(warm_codes[0], START_DATE, END_DATE, client)),
+        Case("fetch_adjusted_qfq",
+             lambda: load_stock_frame(next_warm(), START_DATE, END_DATE, client, adj="qfq"),
+             setup=redis.flushall),
+        Case("query_batch",
+             lambda: query_stock_data(query, client),
+             iterations=10, setup=redis.flushall),
+        Case("compact_frame", lambda: compact_frame(raw)),
+        # 与 paged_table 相同：按日期排序取一页后投影并替换列名
+        Case("table_page",
+             lambda: to_display_frame(page_frame(result, 'trade_date', False, 1, 100), DEFAULT_COLUMNS, COLUMN_NAMES),
+             iterations=100),
+        Case("registry_build", lambda: SymbolRegistry(stocks), iterations=3, warmup=1),
+        Case("symbol_resolve_all", lambda: [registry.resolve(code) for code in inputs]),
+        Case("symbol_search", lambda: [registry.search(prefix) for prefix in prefixes]),
+        Case("password_verify", lambda: verify_password("benchmark-password", password_hash), iterations=5, warmup=1),
+        Case("token_decode", lambda: decode_access_token(token), iterations=1000, warmup=10)
+    ]
+
+
+def git_revision() -> Optional[str]:
+    """当前代码的提交号（不在 git 仓库中时为 None）"""
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=root_dir, capture_output=True, text=True, check=True
+        )
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    """与基准结果比较中位耗时和内存峰值，返回超过 threshold 的退化项"""
+    regressions = []
+    print(f"\n{'case':<26}{'median':>12}{'baseline':>12}{'ratio':>8}{'peak':>12}{'baseline':>12}{'ratio':>8}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        time_ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] else 1.0
+        peak_ratio = result["peak_kb"] / base["peak_kb"] if base["peak_kb"] else 1.0
+        flags = []
+        if time_ratio > 1 + threshold:
+            flags.append("time")
+        if peak_ratio > 1 + threshold:
+            flags.append("memory")
+        if flags:
+            regressions.append(f"{name} ({', '.join(flags)})")
+        print(f"{name:<26}{result['median_ms']:>10.2f}ms{base['median_ms']:>10.2f}ms{time_ratio:>8.2f}"
+              f"{result['peak_kb']:>10.0f}KB{base['peak_kb']:>10.0f}KB{peak_ratio:>8.2f}"
+              + ("  <- " + ", ".join(flags) if flags else ""))
+    return regressions
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="数据查询、指标计算、代码解析和认证热点路径的基准测试")
+    parser.add_argument("--filter", help="只运行名称包含该字符串的用例")
+    parser.add_argument("--latency", type=float, default=0.0, help="模拟接口每次调用的延迟（秒）")
+    parser.add_argument("--output", help="把结果保存为 JSON 文件")
+    parser.add_argument("--compare", help="与之前保存的 JSON 结果比较")
+    parser.add_argument("--threshold", type=float, default=0.2, help="判定为退化的相对增幅（默认 20%%）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="smart-inv-bench-") as workdir:
+        # 本地存储使用临时目录，每次运行都从空存储开始
+        os.environ["BAR_STORE_DIR"] = str(Path(workdir) / "bars")
+        os.environ["INDICATOR_STORE_DIR"] = str(Path(workdir) / "indicators")
+        os.environ.setdefault("STOCK_LIST_PATH", str(root_dir / "data" / "stock_list.csv"))
+
+        print("Preparing benchmark data...")
+        cases = build_cases(args.latency)
+        if args.filter:
+            cases = [case for case in cases if args.filter in case.name]
+
+        results = {}
+        for case in cases:
+            results[case.name] = measure(case)
+            result = results[case.name]
+            print(f"{case.name:<26} median {result['median_ms']:>10.2f}ms  p95 {result['p95_ms']:>10.2f}ms  "
+                  f"peak {result['peak_kb']:>10.0f}KB")
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "pyarrow": pa.__version__,
+            "latency": args.latency
+        },
+        "results": results
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"Results saved to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nRegressions: " + "; ".join(regressions))
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""add watchlists
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 引入迁移之前由 create_all 创建的数据库可能已经有这张表
+    if sa.inspect(op.get_bind()).has_table("watchlists"):
+        return
+
+    op.create_table(
+        "watchlists",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("ts_code", sa.String(length=20), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "ts_code", name="uq_watchlists_user_code"),
+    )
+    op.create_index(op.f("ix_watchlists_id"), "watchlists", ["id"], unique=False)
+    op.create_index(op.f("ix_watchlists_user_id"), "watchlists", ["user_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_watchlists_user_id"), table_name="watchlists")
+    op.drop_index(op.f("ix_watchlists_id"), table_name="watchlists")
+    op.drop_table("watchlists")
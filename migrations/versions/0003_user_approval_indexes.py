@@ -0,0 +1,29 @@
+"""index user_approvals status and user_id
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f("ix_user_approvals_status"), "user_approvals", ["status"], unique=False)
+    op.create_index(op.f("ix_user_approvals_user_id"), "user_approvals", ["user_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_user_approvals_user_id"), table_name="user_approvals")
+    op.drop_index(op.f("ix_user_approvals_status"), table_name="user_approvals")
@@ -0,0 +1,79 @@
+import sys
+import time
+import argparse
+from itertools import product
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+import pandas as pd
+
+from app.config import BACKTEST_WORKERS
+from app.market.backtest import MACrossSignal, VolumeBreakoutSignal, load_panel, run_backtest, sweep
+
+
+def parse_values(text: str, cast) -> list:
+    """解析逗号分隔的参数取值"""
+    return [cast(value) for value in text.split(",") if value]
+
+
+def build_signals(args) -> list:
+    """按命令行参数生成策略（多个取值时做笛卡尔积）"""
+    if args.strategy == "ma":
+        return [
+            MACrossSignal(fast, slow)
+            for fast, slow in product(parse_values(args.fast, int), parse_values(args.slow, int))
+            if fast < slow
+        ]
+    return [
+        VolumeBreakoutSignal(threshold, hold_days)
+        for threshold, hold_days in product(parse_values(args.threshold, float), parse_values(args.hold_days, int))
+    ]
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="基于本地日线数据回测全市场策略")
+    parser.add_argument("strategy", choices=["ma", "volume"], help="ma: 均线交叉；volume: 放量突破")
+    parser.add_argument("--start", help="回测开始日期（YYYYMMDD），默认本地数据的最早日期")
+    parser.add_argument("--end", help="回测结束日期（YYYYMMDD），默认本地数据的最新日期")
+    parser.add_argument("--codes", help="逗号分隔的股票代码，默认本地已存储的全部股票")
+    parser.add_argument("--fast", default="5", help="均线交叉的快线周期，可用逗号分隔多个取值")
+    parser.add_argument("--slow", default="20", help="均线交叉的慢线周期，可用逗号分隔多个取值")
+    parser.add_argument("--threshold", default="2.0", help="放量突破的量比阈值，可用逗号分隔多个取值")
+    parser.add_argument("--hold-days", default="5", help="放量突破的持有天数，可用逗号分隔多个取值")
+    parser.add_argument("--cost", type=float, default=0.0, help="单边交易成本（按成交金额比例）")
+    parser.add_argument("--workers", type=int, default=BACKTEST_WORKERS, help="参数扫描的进程数")
+    parser.add_argument("--output", help="把每只股票（单组参数）或每组参数（扫描）的结果保存为 CSV")
+    args = parser.parse_args()
+
+    signals = build_signals(args)
+    if not signals:
+        parser.error("没有有效的参数组合")
+
+    print("Loading bars from local store...")
+    started = time.perf_counter()
+    ts_codes = parse_values(args.codes, str) if args.codes else None
+    panel = load_panel(ts_codes, args.start, args.end)
+    print(f"Loaded {len(panel.ts_codes)} symbols x {len(panel.dates)} trading days "
+          f"in {time.perf_counter() - started:.1f}s.")
+
+    started = time.perf_counter()
+    if len(signals) == 1:
+        result = run_backtest(panel, signals[0], args.cost)
+        print(f"{signals[0]} finished in {time.perf_counter() - started:.1f}s.")
+        print(pd.Series(result.summary).round(4).to_string())
+        table = result.symbols
+    else:
+        table = sweep(panel, signals, args.cost, args.workers)
+        print(f"Swept {len(signals)} parameter sets in {time.perf_counter() - started:.1f}s.")
+        print(table.round(4).to_string(index=False))
+
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+import pandas as pd
+
+from app.market.adjust import ADJUST_NAMES
+from app.market.tushare_client import get_tushare_client
+from app.services.export import EXPORT_FORMATS, EXPORT_SUFFIXES, export_stock_data
+from app.services.market_data import COLUMN_NAMES, DEFAULT_COLUMNS, StockQuery
+
+# 默认导出的历史年数（与 README 中的历史数据范围一致）
+DEFAULT_HISTORY_YEARS = 10
+
+# 每处理多少只股票输出一次进度
+PROGRESS_EVERY = 100
+
+
+def parse_values(text: str) -> list:
+    """解析逗号分隔的取值"""
+    return [value.strip() for value in text.split(",") if value.strip()]
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="把股票日线及技术指标流式导出为 Parquet 或 gzip 压缩的 CSV")
+    parser.add_argument("--codes", help="逗号分隔的股票代码，默认股票列表中的全部股票")
+    parser.add_argument("--start", help="开始日期（YYYYMMDD），默认最近10年")
+    parser.add_argument("--end", help="结束日期（YYYYMMDD），默认今天")
+    parser.add_argument("--columns", default=",".join(DEFAULT_COLUMNS),
+                        help=f"逗号分隔的数据列，可选: {', '.join(COLUMN_NAMES)}")
+    parser.add_argument("--adj", choices=[adj for adj in ADJUST_NAMES if adj], help="复权方式，默认不复权")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="parquet", help="导出格式")
+    parser.add_argument("--output", help="输出文件，默认 export_{开始}_{结束} 加格式后缀")
+    parser.add_argument("--stock-list", default=str(root_dir / "data" / "stock_list.csv"), help="股票列表文件")
+    args = parser.parse_args()
+
+    end_date = datetime.strptime(args.end, "%Y%m%d").date() if args.end else datetime.now().date()
+    start_date = (
+        datetime.strptime(args.start, "%Y%m%d").date() if args.start
+        else end_date - timedelta(days=365 * DEFAULT_HISTORY_YEARS)
+    )
+    if args.codes:
+        symbols = parse_values(args.codes)
+    else:
+        symbols = pd.read_csv(args.stock_list, dtype=str)["ts_code"].tolist()
+    try:
+        query = StockQuery(tuple(symbols), start_date, end_date, tuple(parse_values(args.columns)), args.adj)
+    except ValueError as e:
+        parser.error(str(e))
+
+    output = Path(args.output or f"export_{start_date:%Y%m%d}_{end_date:%Y%m%d}{EXPORT_SUFFIXES[args.format]}")
+    started = time.perf_counter()
+
+    def progress(done: int, total: int) -> None:
+        if done % PROGRESS_EVERY == 0 or done == total:
+            print(f"{done}/{total} symbols processed in {time.perf_counter() - started:.0f}s")
+
+    print(f"Exporting {len(symbols)} symbols from {start_date} to {end_date} to {output}...")
+    with open(output, "wb") as sink:
+        result = export_stock_data(query, get_tushare_client(), sink, args.format, progress)
+
+    print(f"Exported {result.rows} rows of {result.symbols} symbols "
+          f"({output.stat().st_size / 1024 / 1024:.1f} MB) in {time.perf_counter() - started:.1f}s.")
+    if result.unknown:
+        print(f"Unknown symbols: {', '.join(result.unknown)}")
+    if result.errors:
+        print(f"{len(result.errors)} symbols skipped: " +
+              "; ".join(f"{code} ({error})" for code, error in list(result.errors.items())[:10]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import sys
+import time
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到 Python 路径
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+import pandas as pd
+
+from app.market.adjust import fill_adj_factor, merge_adj_factor
+from app.market.indicators import rebuild_market_indicators
+from app.market.screener import build_snapshot
+from app.market.store import DATE_FORMAT, get_bar_store, settled_end_date, shift_date
+from app.market.tushare_client import get_tushare_client
+
+# 默认回补的历史年数（与 README 中的历史数据范围一致）
+DEFAULT_HISTORY_YEARS = 10
+
+
+def load_universe(path: Path) -> pd.DataFrame:
+    """读取全市场股票列表"""
+    universe = pd.read_csv(path, dtype={"ts_code": str, "symbol": str, "list_date": str})
+    universe["list_date"] = universe["list_date"].fillna("")
+    return universe
+
+
+def get_high_water_marks(store, ts_codes) -> dict:
+    """获取每只股票已入库的最后日期"""
+    marks = {}
+    for ts_code in ts_codes:
+        coverage = store.coverage(ts_code)
+        marks[ts_code] = coverage[1] if coverage else None
+    return marks
+
+
+def get_trade_dates(pro, start_date: str, end_date: str) -> list:
+    """获取区间内的交易日（升序）"""
+    cal = pro.trade_cal(exchange="SSE", start_date=start_date, end_date=end_date, is_open="1")
+    return sorted(cal["cal_date"].tolist())
+
+
+def fetch_trade_dates(pro, trade_dates: list) -> tuple:
+    """按交易日批量拉取全市场日线及复权因子
+
+    各交易日的请求并发提交，由客户端统一限流；遇到尚未发布数据的交易日
+    （返回为空）即停止，保证入库区间连续。返回 (数据, 实际拉取到的最后交易日)。
+    """
+    futures = [
+        (pro.submit("daily", trade_date=trade_date), pro.submit("adj_factor", trade_date=trade_date))
+        for trade_date in trade_dates
+    ]
+    frames = []
+    last_date = None
+    for trade_date, (daily, factors) in zip(trade_dates, futures):
+        df = daily.result()
+        if df.empty:
+            print(f"No data for {trade_date} yet, stopping here.")
+            for pending in futures:
+                for future in pending:
+                    future.cancel()
+            break
+        # 缺失的因子在写入各股票分区时补齐
+        frames.append(merge_adj_factor(df, factors.result()))
+        last_date = trade_date
+    if not frames:
+        return pd.DataFrame(), None
+    return pd.concat(frames, ignore_index=True), last_date
+
+
+def fill_missing_factors(store, ts_code: str, mark, bars: pd.DataFrame) -> pd.DataFrame:
+    """补齐缺失的复权因子：沿用该股票已入库的最后一个因子，没有时按 fill_adj_factor 补齐
+
+    入库的因子没有空值，查询复权数据时不需要重新拉取。
+    """
+    bars = bars.sort_values("trade_date")
+    factors = bars["adj_factor"]
+    if mark and pd.isna(factors.iloc[0]):
+        previous = store.read(ts_code, end_date=mark, columns=["adj_factor"])["adj_factor"].dropna()
+        if not previous.empty:
+            factors = pd.concat([previous.tail(1), factors], ignore_index=True)
+            return bars.assign(adj_factor=fill_adj_factor(factors).iloc[1:].to_numpy())
+    return bars.assign(adj_factor=fill_adj_factor(factors).to_numpy())
+
+
+def ingest_batch(store, universe: pd.DataFrame, marks: dict, df: pd.DataFrame,
+                 default_start: str, batch_end: str) -> int:
+    """把一批交易日的数据写入各股票分区，返回更新的股票数"""
+    groups = dict(tuple(df.groupby("ts_code"))) if not df.empty else {}
+    updated = 0
+    for row in universe.itertuples(index=False):
+        mark = marks[row.ts_code]
+        if mark:
+            covered_start = shift_date(mark, 1)
+        else:
+            covered_start = max(default_start, row.list_date or default_start)
+        if covered_start > batch_end:
+            continue
+
+        bars = groups.get(row.ts_code)
+        if bars is not None:
+            bars = bars[bars["trade_date"] >= covered_start]
+            if not bars.empty and bars["adj_factor"].isna().any():
+                bars = fill_missing_factors(store, row.ts_code, mark, bars)
+        store.write(row.ts_code, bars, covered_start, batch_end)
+        marks[row.ts_code] = batch_end
+        updated += 1
+    return updated
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="按交易日增量拉取全市场日线数据")
+    parser.add_argument("--start", help="无历史数据的股票从该日期开始回补（YYYYMMDD），默认最近10年")
+    parser.add_argument("--end", help="拉取截止日期（YYYYMMDD），默认今天")
+    parser.add_argument("--batch-days", type=int, default=250, help="每批写入的交易日数量")
+    parser.add_argument("--skip-indicators", action="store_true", help="入库后不重建全市场指标")
+    parser.add_argument("--stock-list", default=str(root_dir / "data" / "stock_list.csv"), help="股票列表文件")
+    args = parser.parse_args()
+
+    today = datetime.now().strftime(DATE_FORMAT)
+    end_date = args.end or today
+    default_start = args.start or (datetime.now() - timedelta(days=365 * DEFAULT_HISTORY_YEARS)).strftime(DATE_FORMAT)
+
+    print("Starting daily ingestion...")
+    pro = get_tushare_client()
+    store = get_bar_store()
+
+    universe = load_universe(Path(args.stock_list))
+    marks = get_high_water_marks(store, universe["ts_code"])
+
+    # 从所有股票中最早的缺口开始拉取
+    starts = [shift_date(mark, 1) if mark else default_start for mark in marks.values()]
+    fetch_start = min(starts)
+    if fetch_start > end_date:
+        print("All symbols are up to date!")
+        return
+
+    trade_dates = get_trade_dates(pro, fetch_start, end_date)
+    print(f"Fetching {len(trade_dates)} trading days from {fetch_start} to {end_date}...")
+
+    for i in range(0, len(trade_dates), args.batch_days):
+        batch_dates = trade_dates[i:i + args.batch_days]
+        df, last_date = fetch_trade_dates(pro, batch_dates)
+        if last_date is None:
+            break
+        batch_end = last_date
+        if last_date == trade_dates[-1]:
+            # 最后一个交易日之后的非交易日也视为已覆盖
+            batch_end = max(last_date, settled_end_date(end_date, df))
+        updated = ingest_batch(store, universe, marks, df, default_start, batch_end)
+        print(f"Ingested {len(df)} bars up to {last_date}, {updated} symbols updated.")
+        if last_date != batch_dates[-1]:
+            break
+
+    if not args.skip_indicators:
+        print("Rebuilding indicators for the whole market...")
+        started = time.perf_counter()
+        count = rebuild_market_indicators(universe["ts_code"].tolist())
+        print(f"Indicators rebuilt for {count} symbols in {time.perf_counter() - started:.1f}s.")
+
+        count = build_snapshot(universe["ts_code"].tolist())
+        print(f"Market snapshot built for {count} symbols.")
+
+    print("Daily ingestion completed!")
+
+if __name__ == "__main__":
+    main()
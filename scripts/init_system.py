@@ -6,16 +6,16 @@ from pathlib import Path
 root_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(root_dir))
 
-from app.database.models import Base
-from app.database.session import engine, SessionLocal
+from app.database.init_db import upgrade_schema
+from app.database.session import SessionLocal
 from app.services.user import create_user, get_user_by_username
 from app.config import ADMIN_USERNAME, ADMIN_PASSWORD, ADMIN_EMAIL
 
 def init_database():
-    """初始化数据库表"""
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully!")
+    """初始化数据库表（执行 Alembic 迁移）"""
+    print("Running database migrations...")
+    upgrade_schema()
+    print("Database migrated successfully!")
 
 def create_admin_user():
     """创建管理员用户"""
@@ -9,6 +9,8 @@ setup(
         "pandas",
         "tushare",
         "numpy",
+        "pyarrow",
+        "pypinyin",
         "altair",
         "sqlalchemy",
         "psycopg2-binary",